@@ -19,6 +19,7 @@ f(x) = g(x)+h(x)
 where,
 g(x) = depth of node X in the search tree (equivalent to cost so far)
 h(x) = the number of tiles not in their goal position in a given state X (equivalent to minimum cost to completion)
+(see algorithms/heuristics.py for this and the stronger Manhattan distance and linear conflict heuristics)
 
 States: Location of eight tiles plus blank
 Initial state: Any state can be designated as the initial state
@@ -44,6 +45,9 @@ Whether you feel you have the skills to do this or not, it is a valuable exercis
   the number of possible actions for any given SearchNode its own name.
 - it should be possible to generate a state graph for this problem by applying the valid actions
   to any state on the frontier.
+- the Problem isn't limited to 3x3: the board size comes from the start and goal StateNodes, e.g.
+  StateNode.from_tiles("1 2 3 4 5 6 7 8 9 10 11 12 13 14 15 0") for the 15-puzzle, or
+  StateNode.from_tiles("12345670", width=4) for a 4x2 board.
 
 """
 
@@ -51,7 +55,151 @@ Whether you feel you have the skills to do this or not, it is a valuable exercis
 # in classes that are the type of the class itself)
 from __future__ import annotations
 
-from typing import Hashable
+import heapq
+import logging
+from functools import lru_cache, partial
+from itertools import count
+from math import isqrt
+from typing import Hashable, Sequence
+
+from algorithms.heuristics import Heuristic, make_heuristic
+from algorithms.search_result import SearchResult, SearchStatus
+
+# NOTE: Solver reports through this logger instead of printing: the outcome and the path at INFO,
+#  the frontier on every add and the reached nodes on failure at DEBUG. Nothing is shown unless the
+#  caller configures logging (e.g. logging.basicConfig(level=logging.INFO)), and every message that
+#  takes work to format is behind a level check, so with logging off the search formats nothing.
+logger = logging.getLogger(__name__)
+
+# The board is packed into a single int, tile_bits bits per tile, with the tile at board
+# index i in bits [i * tile_bits, (i + 1) * tile_bits). The blank is tile 0, e.g. for 3x3
+# (tile_bits = 4, so one hex digit per tile):
+# ├─┬─┬─┤
+# │2│8│3│
+# ├─┼─┼─┤                      index: 8 7 6 5 4 3 2 1 0
+# │1│6│4│ ==> "283164705" ==> 0x 5 0 7 4 6 1 3 8 2
+# ├─┼─┼─┤
+# │7│ │5│
+# └─┴─┴─┘
+# Moving the blank into the square at swap_index moves the tile there into the blank's square,
+# which is two shifts and an add: the blank's bits are 0, so no masking is needed.
+
+# moves are named for the direction the blank moves in.
+# OPPOSITE_MOVE[move] is the move that undoes it.
+MOVE_NAMES = ("up", "down", "right", "left")
+OPPOSITE_MOVE = (1, 0, 3, 2)
+
+
+class Board:
+    """
+    The geometry of a width x height sliding puzzle board (tiles 1 to width * height - 1, plus the blank).
+    Boards are shared: Board.of() returns the same Board for the same size, and every StateNode
+    refers to its Board.
+    """
+    width: int
+    height: int
+    size: int
+    tile_bits: int # at least 4, and enough for the largest tile (5 bits for a 5x5 board)
+    tile_mask: int
+    moves: tuple[tuple[tuple[int, int], ...], ...] # see build_move_table()
+
+    def __init__(self, width: int, height: int):
+        if width < 2 or height < 2:
+            raise ValueError("a sliding puzzle board needs at least 2 rows and 2 columns")
+        self.width = width
+        self.height = height
+        self.size = width * height
+        self.tile_bits = max(4, (self.size - 1).bit_length())
+        self.tile_mask = (1 << self.tile_bits) - 1
+        self.moves = build_move_table(width, height)
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def of(width: int, height: int) -> Board:
+        return Board(width, height)
+
+    def pack(self, tiles: Sequence[int]) -> int:
+        # e.g. [2, 8, 3, 1, 6, 4, 7, 0, 5] --> packed state_id
+        if sorted(tiles) != list(range(self.size)):
+            raise ValueError(f"a {self.width}x{self.height} board needs each of the tiles 0 to {self.size - 1} once")
+        state_id = 0
+        for index, tile in enumerate(tiles):
+            state_id |= tile << (index * self.tile_bits)
+        return state_id
+
+    def unpack(self, state_id: int) -> list[int]:
+        return [(state_id >> (index * self.tile_bits)) & self.tile_mask for index in range(self.size)]
+
+    def __repr__(self):
+        return f"Board({self.width}, {self.height})"
+
+
+def build_move_table(width: int, height: int) -> tuple[tuple[tuple[int, int], ...], ...]:
+    """
+    For each position of the blank, the (move, swap_index) pairs of the moves allowed from there, e.g. for 3x3
+    012
+    345  blank at 0 --> ((down, 3), (right, 1))
+    678  blank at 4 --> ((up, 1), (down, 7), (right, 5), (left, 3))
+    """
+    table = []
+    for blank_index in range(width * height):
+        row, column = divmod(blank_index, width)
+        moves = []
+        if row > 0:
+            moves.append((0, blank_index - width))
+        if row < height - 1:
+            moves.append((1, blank_index + width))
+        if column < width - 1:
+            moves.append((2, blank_index + 1))
+        if column > 0:
+            moves.append((3, blank_index - 1))
+        table.append(tuple(moves))
+    return tuple(table)
+
+
+def parse_tiles(tiles: str | Sequence[int]) -> list[int]:
+    """
+    e.g. "283164705", "2 8 3 1 6 4 7 0 5", "2,8,3,1,6,4,7,0,5" or [2, 8, 3, 1, 6, 4, 7, 0, 5] --> [2, 8, 3, 1, 6, 4, 7, 0, 5]
+    A string without separators has one digit per tile, so boards with tiles above 9
+    (e.g. the 15-puzzle) need a separated string or a sequence.
+    """
+    if isinstance(tiles, str):
+        if "," in tiles or " " in tiles.strip():
+            return [int(tile) for tile in tiles.replace(",", " ").split()]
+        return [int(tile) for tile in tiles.strip()]
+    return [int(tile) for tile in tiles]
+
+
+def is_solvable(start_node: StateNode, goal_node: StateNode) -> bool:
+    """
+    Whether goal_node can be reached from start_node, in O(n) for an n-square board of any shape.
+    Every move swaps the blank with a neighbour: it is a transposition of the board (flipping
+    the parity of the permutation that takes the start board to the current board) and it
+    moves the blank one square (flipping the parity of the blank's row + column distance from
+    where it started). So the two parities always match, and the puzzle is solvable iff they
+    match for the goal board.
+    This is the classic inversion count rule in another form (including the "blank row" rule
+    for boards of even width), but it works for any goal board, not just the standard one.
+    """
+    goal_index = [0] * start_node.board.size
+    for index, tile in enumerate(goal_node.tiles()):
+        goal_index[tile] = index
+    # the permutation of squares: the tile on square i in start_node is on square permutation[i] in goal_node
+    permutation = [goal_index[tile] for tile in start_node.tiles()]
+    # parity of a permutation = parity of (number of elements - number of cycles)
+    cycles = 0
+    seen = [False] * len(permutation)
+    for index in range(len(permutation)):
+        if not seen[index]:
+            cycles += 1
+            while not seen[index]:
+                seen[index] = True
+                index = permutation[index]
+    width = start_node.board.width
+    start_row, start_column = divmod(start_node.blank_index, width)
+    goal_row, goal_column = divmod(goal_node.blank_index, width)
+    blank_distance = abs(start_row - goal_row) + abs(start_column - goal_column)
+    return (len(permutation) - cycles) % 2 == blank_distance % 2
 
 
 class Problem:
@@ -60,127 +208,48 @@ class Problem:
     """
     start_node: StateNode
     goal_node: StateNode
-    actions: tuple
+    board: Board
+    width: int
+    height: int
+    tile_bits: int
+    moves: tuple[tuple[tuple[int, int], ...], ...] # see build_move_table()
 
     def __init__(self, start_node, goal_node):
+        if start_node.board is not goal_node.board:
+            raise ValueError(f"start and goal are on different boards: {start_node.board} and {goal_node.board}")
         self.start_node = start_node
         self.goal_node = goal_node
-        self.actions = (self.swap_up, self.swap_down, self.swap_right, self.swap_left)
+        self.board = start_node.board
+        self.width = self.board.width
+        self.height = self.board.height
+        self.tile_bits = self.board.tile_bits
+        self.moves = self.board.moves
 
     """
     The actions for the problem that move from one SearchNode to another
     are a set of swaps between the blank space and another tile.
-    
-    As these actions are intended to generate new SearchNodes and not just
-    move between known states, the functions will return StateNodes, which
-    we will then use to generate new SearchNodes.
+    The swaps allowed for each position of the blank are precomputed in the move table,
+    so generating a child state is a table lookup plus apply().
     """
-    def swap_up(self, from_state: StateNode.state_id) -> StateNode.state_id:
-        """
-        012 --> no swaps
-        345 --> swap index with -3
-        678 --> swap index with -3
-        """
-        new_state = from_state
-        blank_index = from_state.index("0")
-
-        if blank_index <= 2:
-            raise RuntimeError("Can't swap up: blank is already in top row.")
-
-        swap_index = blank_index - 3
-        swap_tile = from_state[swap_index]
-        new_state = str_replace_char_at(new_state, blank_index, swap_tile)
-        new_state = str_replace_char_at(new_state, swap_index, "0")
-
-        return new_state
-
-
-    def swap_down(self, from_state: StateNode.state_id) -> StateNode.state_id:
-        """
-        012 --> swap index with +3
-        345 --> swap index with +3
-        678 --> no swaps
-        """
-        new_state = from_state
-        blank_index = from_state.index("0")
-
-        if blank_index >= 6:
-            raise RuntimeError("Can't swap down: blank is already in bottom row.")
-
-        swap_index = blank_index + 3
-        swap_tile = from_state[swap_index]
-        new_state = str_replace_char_at(new_state, blank_index, swap_tile)
-        new_state = str_replace_char_at(new_state, swap_index, "0")
-
-        return new_state
-
-
-    def swap_right(self, from_state: StateNode.state_id) -> StateNode.state_id:
-        """
-        012
-        345
-        678
-          ↑ no swaps
-        ↑↑  index + 1
-        """
-        new_state = from_state
-        blank_index = from_state.index("0")
-
-        if blank_index in (2,5,8):
-            raise RuntimeError("Can't swap right: blank is already in right column.")
-
-        swap_index = blank_index + 1
-        swap_tile = from_state[swap_index]
-        new_state = str_replace_char_at(new_state, blank_index, swap_tile)
-        new_state = str_replace_char_at(new_state, swap_index, "0")
-
-        return new_state
-
-
-    def swap_left(self, from_state: StateNode.state_id) -> StateNode.state_id:
-        """
-        012
-        345
-        678
-        ↑   no swaps
-         ↑↑ index - 1
-        """
-        new_state = from_state
-        blank_index = from_state.index("0")
-
-        if blank_index in (0,3,6):
-            raise RuntimeError("Can't swap right: blank is already in left column.")
-
-        swap_index = blank_index - 1
-        swap_tile = from_state[swap_index]
-        new_state = str_replace_char_at(new_state, blank_index, swap_tile)
-        new_state = str_replace_char_at(new_state, swap_index, "0")
-
-        return new_state
-
-
-def str_replace_char_at(string: str, char_index: int, new_char: chr) -> str:
-    if char_index < 0 or char_index >= len(string):
-        raise ValueError("position must be within string length")
-
-    new_string = string[:char_index] + new_char + string[char_index + 1:]
-    return new_string
+    def apply(self, from_state: StateNode, swap_index: int) -> StateNode:
+        # move the tile at swap_index into the blank's square, and the blank to swap_index
+        state_id = from_state.state_id
+        shift = swap_index * self.tile_bits
+        tile = (state_id >> shift) & self.board.tile_mask
+        return StateNode(state_id - (tile << shift) + (tile << (from_state.blank_index * self.tile_bits)),
+                         swap_index, self.board)
 
 
 class StateNode:
     """
     A Node in the underlying state data from the problem.
     """
-    # a minimal representation of the state of the puzzle board, e.g.
-    # ├─┬─┬─┤
-    # │2│8│3│
-    # ├─┼─┼─┤
-    # │1│6│4│ ==> "283164705"
-    # ├─┼─┼─┤
-    # │7│ │5│
-    # └─┴─┴─┘
-    #
-    state_id: str
+    # a minimal representation of the state of the puzzle board: the packed tiles (see Board.pack())
+    # plus the position of the blank, which is cached because every move needs it.
+    __slots__ = ("state_id", "blank_index", "board")
+    state_id: int
+    blank_index: int
+    board: Board
 
     # NOTE: in this case, the actions available from each state will follow a set
     #  of rules that will depend on the position of the blank square. So we can
@@ -189,58 +258,59 @@ class StateNode:
     #  of the expand() function (though this seems like a stretch – the expand() function
     #  should expand based on what it's given, not be responsible for knowing the rules of expansion)
 
-    # NOTE: the fact that this class consists of a single property and a generic constructor
-    #  is a code smell, but it's a result of trying to build these search solvers in the most
-    #  general way possible, ideally being able to refactor the general structure in a simple way
-    #  in order to adapt the template to different algorithms and problem types.
-
-    def __init__(self, state_id):
+    def __init__(self, state_id: int, blank_index: int, board: Board):
         self.state_id = state_id
+        self.blank_index = blank_index
+        self.board = board
+
+    @classmethod
+    def from_tiles(cls, tiles: str | Sequence[int], width: int | None = None, height: int | None = None) -> StateNode:
+        """
+        e.g. StateNode.from_tiles("283164705") or StateNode.from_tiles(range(16), width=4)
+        The board is square unless width or height says otherwise.
+        """
+        tiles = parse_tiles(tiles)
+        if width is None and height is None:
+            width = height = isqrt(len(tiles))
+        elif width is None:
+            width = len(tiles) // height
+        elif height is None:
+            height = len(tiles) // width
+        if width * height != len(tiles):
+            raise ValueError(f"{len(tiles)} tiles don't fill a {width}x{height} board")
+        board = Board.of(width, height)
+        return cls(board.pack(tiles), tiles.index(0), board)
+
+    def tiles(self) -> list[int]:
+        return self.board.unpack(self.state_id)
+
+    def __str__(self):
+        if self.board.size <= 10:
+            return "".join(str(tile) for tile in self.tiles())
+        return " ".join(str(tile) for tile in self.tiles())
 
 
 class SearchNode:
     """
     A Node in the search graph, generated while solving the problem.
     """
-    problem: Problem
+    # NOTE: there is one SearchNode per generated state, so these are kept as small as possible:
+    #  __slots__ (no per-instance __dict__), and no reference to the problem or to the actions.
+    #  The actions available follow from state.blank_index and the problem's move table.
+    __slots__ = ("state", "parent", "path_cost", "heuristic_cost", "move")
     state: StateNode
-    parent: SearchNode
-    path_cost: int
-    actions: tuple
-
-    def __init__(self, problem: Problem, state_node: StateNode, parent_node: SearchNode | None, path_cost: int | float):
-        self.problem = problem
-        self.state: StateNode = state_node
-        self.parent: SearchNode = parent_node
-        # the action that led to this SearchNode
-        # self.action = action
-        # set the actions available to this SearchNode
-        # NOTE: setting the actions functions as properties on the SearchNodes is sensible so long as
-        #  a) memory isn't at risk of being used up and
-        #  b) the functions are passed by reference and stored as pointers until they're actually used
-        self.set_actions()
+    parent: SearchNode | None
+    path_cost: int | float # g(x)
+    heuristic_cost: int # h(x), set by Frontier.evaluate()
+    move: int | None # the index (into MOVE_NAMES) of the move that led to this SearchNode
+
+    def __init__(self, state_node: StateNode, parent_node: SearchNode | None, path_cost: int | float,
+                 move: int | None = None):
+        self.state = state_node
+        self.parent = parent_node
         self.path_cost = path_cost
-
-    def set_actions(self) -> None:
-        """
-        Based on the state, some actions are permitted and some are excluded, depending on the
-        position of the blank space. Set the available actions for this SearchNode.
-        """
-        blank_index = self.state.state_id.index("0")
-        node_actions = list(self.problem.actions)
-        if blank_index <= 2:
-            # can't swap up
-            node_actions.remove(self.problem.actions[0])
-        if blank_index >= 6:
-            # can't swap down
-            node_actions.remove(self.problem.actions[1])
-        if blank_index in (2,5,8):
-            # can't swap right
-            node_actions.remove(self.problem.actions[2])
-        if blank_index in (0,3,6):
-            # can't swap left
-            node_actions.remove(self.problem.actions[3])
-        self.actions = tuple(node_actions)
+        self.heuristic_cost = 0
+        self.move = move
 
 
 class Frontier:
@@ -251,68 +321,77 @@ class Frontier:
     f(x) = g(x)+h(x)
     where
     g(x) = depth of node X in the search tree (equivalent to cost so far)
-    h(x) = the number of tiles not in their goal position in a given state X (equivalent to minimum cost to completion)
-    Note that we could use the sum of the distances of each tile from the goal state instead of/in addition to h(x).
+    h(x) = an estimate of the minimum cost to completion from a given state X, from a Heuristic
+           (see algorithms/heuristics.py), e.g. the number of tiles not in their goal position, or
+           the sum of the distances of each tile from its goal position.
     The exact evaluation function alters the algorithm, but is only used to select one node from the frontier, so it
     only needs to be as fine-tuned as that task requires.
-    """
-    nodes: set[SearchNode]
-    goal_node: SearchNode
 
-    def __init__(self, goal_node):
-        self.nodes = set()
-        self.goal_node = goal_node
+    The nodes are kept in a binary heap (heapq) keyed on (f, -g, insertion order), so f is computed
+    once per node when it is added, ties on f prefer the deeper node (larger g), and any remaining
+    ties are broken first-in-first-out, which keeps the search deterministic.
+    When a cheaper path to a state is found, the new node is added and the old heap entry is left
+    in place; the old entry is recognised as stale and skipped when it reaches the top (lazy deletion).
+    """
+    heap: list[tuple[int, int, int, SearchNode]]
+    entries: dict[Hashable, SearchNode] # the live SearchNode in the heap for each state_id
+    heuristic: Heuristic
+    counter: count
+    trace: bool # log the whole frontier on every add (DEBUG), checked once here rather than per add
+
+    def __init__(self, heuristic: Heuristic):
+        self.heap = []
+        self.entries = {}
+        self.heuristic = heuristic
+        self.counter = count()
+        self.trace = logger.isEnabledFor(logging.DEBUG)
 
     def is_empty(self):
-        return not self.nodes
+        return not self.entries
 
     def pop(self) -> SearchNode | None:
         # return the node in the frontier with the best score based on the evaluation function
-        # and remove it from the set.
-        top_node = self.top()
-        self.nodes.remove(top_node)
-        return top_node
+        # and remove it from the heap, discarding any stale entries on the way.
+        while self.heap:
+            node = heapq.heappop(self.heap)[3]
+            if self.entries.get(node.state.state_id) is node:
+                del self.entries[node.state.state_id]
+                return node
+        return None
 
     def top(self) -> SearchNode | None:
         # return the node in the frontier with the best score (lowest cost, typically)
-        # based on the evaluation function, but do not remove it from the set.
-        if not self.nodes:
-            return None
-        best_node = next(iter(self.nodes))
-        for node in self.nodes:
-            if self.evaluate(node) < best_node.path_cost:
-                best_node = node
-        return best_node
+        # based on the evaluation function, but do not remove it from the heap.
+        while self.heap:
+            node = self.heap[0][3]
+            if self.entries.get(node.state.state_id) is node:
+                return node
+            # stale entry: a cheaper node for the same state has been added since
+            heapq.heappop(self.heap)
+        return None
 
     def add(self, node: SearchNode) -> None:
-        # add the node to the set (unordered, in this example)
-        self.nodes.add(node)
-        # print(f"Frontier nodes: {self}")
+        # add the node to the heap. If the frontier already holds a node for the same state,
+        # the new node supersedes it and the old heap entry becomes stale.
+        self.entries[node.state.state_id] = node
+        heapq.heappush(self.heap, (self.evaluate(node), -node.path_cost, next(self.counter), node))
+        if self.trace:
+            logger.debug("Frontier nodes: %s", self)
 
     def evaluate(self, node: SearchNode) -> int:
         # The evaluation function f(n).
-        # return a score for the node based on the criteria defined by the problem or algorithm type
-        return node.path_cost + self.nodes_out_of_goal_count(node)
-
-    def nodes_out_of_goal_count(self, node: SearchNode) -> int:
-        """
-        e.g.                           ↓↓  ↓ ↓↓
-        search_node.state.state_id = [234567018]
-        goal_node.state.state_id   = [243560781]
-        count = 5 (we're not counting the blank space)
-        """
-        search_state = node.state.state_id
-        goal_state   = self.goal_node.state.state_id
-        count = 0
-        for i in range(0, len(goal_state)):
-            if goal_state[i] != 0 and goal_state[i] != search_state[i]:
-                count += 1
-        return count
+        # return a score for the node based on the criteria defined by the problem or algorithm type.
+        # h(n) is derived from the parent's h(n) and the one tile that moved, and cached on the node.
+        if node.parent is None:
+            node.heuristic_cost = self.heuristic.estimate(node.state)
+        else:
+            node.heuristic_cost = self.heuristic.update(node.parent.heuristic_cost, node.parent.state, node.state)
+        return node.path_cost + node.heuristic_cost
 
     def __str__(self):
         output = ""
-        for node in self.nodes:
-            output += f"{node.state.state_id}, cost: {node.path_cost}\n"
+        for node in self.entries.values():
+            output += f"{node.state}, cost: {node.path_cost}\n"
         return output
 
 
@@ -324,66 +403,98 @@ class Solver:
     # NOTE: (expanded nodes) ∪ (frontier nodes) == reached nodes
     start_node: SearchNode
     goal_node: SearchNode
+    expanded_count: int # nodes taken off the frontier and expanded
+    generated_count: int # children generated by expand()
 
-    def __init__(self, problem: Problem):
+    def __init__(self, problem: Problem, heuristic: str | Heuristic = "linear_conflict"):
+        # NOTE: heuristic is a Heuristic, or the name of one of the heuristics in
+        #  algorithms/heuristics.py ("misplaced", "manhattan" or "linear_conflict").
         self.problem = problem
-        self.start_node = SearchNode(self.problem, problem.start_node, None, 0)
-        self.goal_node = SearchNode(self.problem, problem.goal_node, None, float('inf'))
-        self.frontier = Frontier(self.goal_node)
+        self.start_node = SearchNode(problem.start_node, None, 0)
+        self.goal_node = SearchNode(problem.goal_node, None, float('inf'))
+        if isinstance(heuristic, str):
+            heuristic = make_heuristic(heuristic, problem)
+        self.frontier = Frontier(heuristic)
         self.frontier.add(self.start_node)
         self.reached = {self.start_node.state.state_id: self.start_node}
-
-    def solve(self) -> None:
+        self.expanded_count = 0
+        self.generated_count = 0
+
+    def solve(self) -> SearchResult:
+        # half of all boards can't reach the goal, and finding that out by search means
+        # exhausting every state reachable from the start. The parity check is O(n).
+        if not is_solvable(self.start_node.state, self.goal_node.state):
+            return self.finish(SearchStatus.UNSOLVABLE, None)
         while not self.frontier.is_empty():
             # visit phase
             current_node = self.frontier.pop()
             if current_node.state.state_id == self.goal_node.state.state_id:
-                self.finish(True, current_node)
-                return
+                return self.finish(SearchStatus.SUCCESS, current_node)
             # expand phase
+            self.expanded_count += 1
             for child_node in self.expand(current_node):
                 if (child_node.state.state_id not in self.reached.keys()
                         or child_node.path_cost < self.reached[child_node.state.state_id].path_cost):
                     self.reached[child_node.state.state_id] = child_node
                     self.frontier.add(child_node)
-        self.finish(False, None)
-
-    def expand(self, node: SearchNode) -> set[SearchNode]:
-        expanded: set = set()
-        for action in node.actions:
-            path_cost = node.path_cost + 1
-            child_state_id = action(node.state.state_id)
-            child_node = SearchNode(self.problem, StateNode(child_state_id), node, path_cost)
-            expanded.add(child_node)
+        return self.finish(SearchStatus.FAILURE, None)
+
+    def expand(self, node: SearchNode) -> list[SearchNode]:
+        expanded: list = []
+        path_cost = node.path_cost + 1
+        # the move that would undo the move into this node can only lead back to the parent's state
+        undo_move = OPPOSITE_MOVE[node.move] if node.move is not None else None
+        for move, swap_index in self.problem.moves[node.state.blank_index]:
+            if move != undo_move:
+                expanded.append(SearchNode(self.problem.apply(node.state, swap_index), node, path_cost, move))
+        self.generated_count += len(expanded)
         return expanded
 
-    def finish(self, success: bool, last_node: SearchNode | None):
-        if success:
-            print(f'success!')
-            print(f'reached goal node: {last_node.state.state_id}')
-            print(f"goal node cost: {last_node.path_cost}")
-            solution_path: list[Hashable] = []
-            path_node = last_node
-            reached_start = False
-            while not reached_start:
-                solution_path.append(path_node.state.state_id)
-                if not path_node.parent:
-                    reached_start = True
-                else:
-                    path_node = path_node.parent
-            solution_path.reverse()
-            print(f"path to goal: {solution_path}")
-        else:
-            print(f'finished without success.')
-            print(f"reached nodes:")
-            for key, value in self.reached.items():
-                print(f"{key}, cost: {value.path_cost}")
-
+    def finish(self, status: SearchStatus, last_node: SearchNode | None) -> SearchResult:
+        counters = {"expanded": self.expanded_count, "generated": self.generated_count}
+        if status is SearchStatus.SUCCESS:
+            result = SearchResult(status, last_node.path_cost, path_builder=partial(self.path_to, last_node), **counters)
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("success! reached goal node: %s, goal node cost: %s", last_node.state, last_node.path_cost)
+                logger.info("path to goal: %s", result.path)
+            return result
+        if status is SearchStatus.UNSOLVABLE:
+            logger.info("puzzle is not solvable: the goal state is not reachable from the start state.")
+            return SearchResult(status, **counters)
+        logger.info("finished without success.")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("reached nodes:\n%s", "\n".join(f"{value.state}, cost: {value.path_cost}"
+                                                         for value in self.reached.values()))
+        return SearchResult(status, **counters)
+
+    @staticmethod
+    def path_to(last_node: SearchNode) -> list[Hashable]:
+        # the boards from the start to last_node, by following the parents back
+        solution_path: list[Hashable] = []
+        path_node = last_node
+        while path_node is not None:
+            solution_path.append(str(path_node.state))
+            path_node = path_node.parent
+        solution_path.reverse()
+        return solution_path
 
 if __name__ == "__main__":
-    start_node_1 = StateNode("283164705")
-    goal_node_1 = StateNode("123804765")
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    start_node_1 = StateNode.from_tiles("283164705")
+    goal_node_1 = StateNode.from_tiles("123804765")
     problem_1 = Problem(start_node_1, goal_node_1)
     a_star_solver = Solver(problem_1)
-    a_star_solver.solve()
+    result_1 = a_star_solver.solve()
+    assert result_1.cost == 5
+
+    # swapping two tiles of a solvable board makes it unsolvable
+    problem_2 = Problem(StateNode.from_tiles("823164705"), goal_node_1)
+    result_2 = Solver(problem_2).solve()
+    assert result_2.status is SearchStatus.UNSOLVABLE
+
+    # 15-puzzle
+    start_node_3 = StateNode.from_tiles("2 3 0 10 6 7 11 8 1 14 4 12 5 13 9 15")
+    goal_node_3 = StateNode.from_tiles("1 2 3 4 5 6 7 8 9 10 11 12 13 14 15 0")
+    result_3 = Solver(Problem(start_node_3, goal_node_3)).solve()
+    assert result_3.cost == 32
     print("done.")
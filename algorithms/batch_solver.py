@@ -0,0 +1,221 @@
+"""
+Solve large batches of independent sliding tile puzzle instances on a process pool.
+
+Instances are read one per line (from a file, stdin or any iterable of lines):
+    <start tiles>              e.g. 283164705    (solved to the batch's goal)
+    <start tiles>;<goal tiles> e.g. 283164705;123804765
+in any format a_star.parse_tiles() reads. Blank lines and lines starting with # are skipped.
+
+The instances are sent to the workers in chunks (one task per chunk, so the per-task overhead of
+the pool is paid once per chunk_size instances), with a bounded number of chunks in flight, so a
+batch of any size streams through in constant memory. Results come back in input order
+(ordered=True), or as soon as each chunk is done (ordered=False), with their input index.
+
+Each worker warms up once, in the pool initializer: it loads the pattern databases or distance
+table (memory-mapped, so the workers share one copy through the page cache) and builds the
+heuristic tables for the batch's goal. Heuristics only depend on the board and the goal, so every
+instance with the same goal reuses the same Heuristic object.
+
+Methods: "ida_star" (ida_star.IDAStarSolver, the default: no per-node memory), "a_star"
+(a_star.Solver) or "table" (a distance_table.DistanceTable file, 3x3 and smaller only).
+
+The output is one line per instance: index, status, cost and the blank's moves as letters, e.g.
+    0	success	5	uurdl
+with u/d/r/l for the moves in a_star.MOVE_NAMES ("-" for no cost or moves).
+"""
+from __future__ import annotations
+
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from itertools import islice
+from typing import Iterable, Iterator, Sequence
+
+from algorithms.a_star import MOVE_NAMES, Problem, Solver, StateNode, parse_tiles
+from algorithms.distance_table import DistanceTable
+from algorithms.heuristics import Heuristic, make_heuristic
+from algorithms.ida_star import IDAStarSolver
+from algorithms.pattern_database import PatternDatabase, PatternDatabaseHeuristic
+from algorithms.search_result import SearchResult
+from algorithms.solver_cache import path_moves
+
+METHODS = ("ida_star", "a_star", "table")
+MOVE_LETTERS = "".join(name[0] for name in MOVE_NAMES)
+
+# (input index, start tiles, goal tiles or None for the batch's goal), in any format parse_tiles() reads
+Instance = tuple[int, str | Sequence[int], str | Sequence[int] | None]
+# (input index, status, cost, moves as letters)
+BatchResult = tuple[int, str, int | None, str | None]
+
+
+class BatchConfig:
+    """
+    Everything a worker needs to set itself up: sent once to each worker when it starts.
+    """
+    width: int
+    height: int
+    goal_tiles: list[int]
+    method: str
+    heuristic: str
+    pattern_database_paths: list[str]
+    table_path: str | None
+
+    def __init__(self, width: int, height: int, goal_tiles: list[int], method: str, heuristic: str,
+                 pattern_database_paths: Sequence[str], table_path: str | None):
+        if method not in METHODS:
+            raise ValueError(f"unknown method {method!r}, expected one of {METHODS}")
+        if method == "table" and table_path is None:
+            raise ValueError("the table method needs a distance table file (see distance_table.py)")
+        self.width = width
+        self.height = height
+        self.goal_tiles = goal_tiles
+        self.method = method
+        self.heuristic = heuristic
+        self.pattern_database_paths = list(pattern_database_paths)
+        self.table_path = table_path
+
+
+class Worker:
+    """
+    The state of one worker process: the config, the loaded tables, and a heuristic per goal.
+    """
+    config: BatchConfig
+    databases: list[PatternDatabase]
+    table: DistanceTable | None
+    heuristics: dict[int, Heuristic] # goal state_id --> the heuristic for that goal
+
+    def __init__(self, config: BatchConfig):
+        self.config = config
+        self.databases = [PatternDatabase.load(path) for path in config.pattern_database_paths]
+        self.table = DistanceTable.load(config.table_path) if config.table_path is not None else None
+        self.heuristics = {}
+        # warm up: the tables for the batch's goal
+        goal_node = StateNode.from_tiles(config.goal_tiles, config.width, config.height)
+        self.heuristic_for(Problem(goal_node, goal_node))
+
+    def heuristic_for(self, problem: Problem) -> Heuristic:
+        goal_id = problem.goal_node.state_id
+        if goal_id not in self.heuristics:
+            if self.databases:
+                self.heuristics[goal_id] = PatternDatabaseHeuristic(problem, self.databases)
+            else:
+                self.heuristics[goal_id] = make_heuristic(self.config.heuristic, problem)
+        return self.heuristics[goal_id]
+
+    def solve(self, instance: Instance) -> BatchResult:
+        index, start_tiles, goal_tiles = instance
+        config = self.config
+        try:
+            start_node = StateNode.from_tiles(start_tiles, config.width, config.height)
+            goal_node = StateNode.from_tiles(goal_tiles if goal_tiles is not None else config.goal_tiles,
+                                             config.width, config.height)
+            problem = Problem(start_node, goal_node)
+            if config.method == "table":
+                result = self.table.solve(problem)
+            elif config.method == "ida_star":
+                result = IDAStarSolver(problem, self.heuristic_for(problem)).solve()
+            else:
+                result = Solver(problem, self.heuristic_for(problem)).solve()
+        except Exception as error:
+            # a malformed instance (or one for another board, table or database) fails on its own, not the
+            # whole chunk. The message is kept to one line, with no tabs, for the output file
+            message = " ".join(str(error).split())
+            return index, f"error: {type(error).__name__}: {message}", None, None
+        return index, result.status.value, result.cost, moves_of(result, config.width) if result.success else None
+
+
+def moves_of(result: SearchResult, width: int) -> str:
+    return "".join(MOVE_LETTERS[move] for move in path_moves(result.path, width))
+
+
+# the Worker of a pool process, set up once by init_worker()
+worker: Worker | None = None
+
+
+def init_worker(config: BatchConfig) -> None:
+    global worker
+    worker = Worker(config)
+
+
+def solve_chunk(chunk: list[Instance]) -> list[BatchResult]:
+    return [worker.solve(instance) for instance in chunk]
+
+
+def parse_instances(lines: Iterable[str]) -> Iterator[Instance]:
+    index = 0
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        # parsed by the workers, so a malformed line only fails its own instance
+        start, _, goal = line.partition(";")
+        yield index, start.strip(), goal.strip() or None
+        index += 1
+
+
+def solve_batch(instances: Iterable[Instance], config: BatchConfig, workers: int | None = None,
+                chunk_size: int = 256, ordered: bool = True) -> Iterator[BatchResult]:
+    """
+    Solve every instance on a pool of worker processes, yielding the results as they come back:
+    in input order if ordered, otherwise as each chunk finishes.
+    """
+    workers = workers or os.cpu_count() or 1
+    instances = iter(instances)
+    # enough chunks in flight to keep every worker busy while results are collected
+    max_pending = workers * 2
+    with ProcessPoolExecutor(workers, initializer=init_worker, initargs=(config,)) as pool:
+        pending: deque[Future] = deque()
+        while True:
+            while len(pending) < max_pending:
+                chunk = list(islice(instances, chunk_size))
+                if not chunk:
+                    break
+                pending.append(pool.submit(solve_chunk, chunk))
+            if not pending:
+                return
+            if ordered:
+                yield from pending.popleft().result()
+            else:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    pending.remove(future)
+                    yield from future.result()
+
+
+def format_result(result: BatchResult) -> str:
+    index, status, cost, moves = result
+    return f"{index}\t{status}\t{'-' if cost is None else cost}\t{moves or '-'}"
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+    import time
+
+    parser = argparse.ArgumentParser(description="Solve a file of sliding tile puzzle instances on a process pool.")
+    parser.add_argument("instances", help="the instances file, one per line ('-' for stdin)")
+    parser.add_argument("--out", default="-", help="the results file ('-' for stdout)")
+    parser.add_argument("--width", type=int, default=3)
+    parser.add_argument("--height", type=int, default=None)
+    parser.add_argument("--goal", default=None, help="goal tiles for instances without one (default: 1 2 ... n 0)")
+    parser.add_argument("--method", choices=METHODS, default="ida_star")
+    parser.add_argument("--heuristic", default="linear_conflict")
+    parser.add_argument("--pdb", nargs="*", default=[], help="pattern database files, used instead of --heuristic")
+    parser.add_argument("--table", default=None, help="a distance table file, for --method table")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=256)
+    parser.add_argument("--unordered", action="store_true", help="write results as they finish, not in input order")
+    args = parser.parse_args()
+
+    height = args.height or args.width
+    goal = parse_tiles(args.goal) if args.goal else [*range(1, args.width * height), 0]
+    batch_config = BatchConfig(args.width, height, goal, args.method, args.heuristic, args.pdb, args.table)
+    start_time = time.perf_counter()
+    solved = 0
+    with (sys.stdin if args.instances == "-" else open(args.instances)) as instances_file, \
+            (sys.stdout if args.out == "-" else open(args.out, "w")) as out_file:
+        for batch_result in solve_batch(parse_instances(instances_file), batch_config, args.workers,
+                                        args.chunk_size, not args.unordered):
+            out_file.write(format_result(batch_result) + "\n")
+            solved += 1
+    print(f"{solved} instances in {time.perf_counter() - start_time:.2f}s", file=sys.stderr)
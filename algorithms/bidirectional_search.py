@@ -0,0 +1,190 @@
+"""
+Bidirectional uniform-cost search: Dijkstra's algorithm run forwards from the start and backwards
+from the goal at the same time, alternating between the two, until the searches meet in the middle.
+
+For a point-to-point query where the search volume grows with the square of the distance (grids,
+road networks) or exponentially (puzzles), two searches of half the depth settle far fewer nodes
+than one search of the full depth.
+
+Each side keeps its own distances, parents and frontier (a binary heap with lazy deletion).
+Every time a side finds a shorter path to a node the other side has already reached, the two
+paths through that node make a candidate start-to-goal path, and the best one is kept (best).
+Stopping criterion: once top_f + top_b >= best, where top_f and top_b are the smallest path costs
+left in each frontier, no path still to be found can be shorter than best (any such path would
+have to go through a node in both frontiers), so best is optimal. Note that stopping as soon as
+the frontiers first touch is *not* enough: that first meeting path is not always the shortest.
+The path is spliced together from the forward parent chain (start --> meeting node) and the
+backward parent chain (meeting node --> goal).
+
+- BidirectionalTraverser: for the graphs dijkstra.Traverser takes (networkx graphs, or CSRGraph snapshots).
+- BidirectionalSolver: for the sliding tile puzzles in a_star.py (every move costs 1, and undoes with one move).
+"""
+from __future__ import annotations
+
+import heapq
+from itertools import count
+from typing import Callable, Hashable, Iterable, TypeVar
+
+from networkx.classes import Graph
+
+from algorithms.a_star import Problem, StateNode, is_solvable
+from algorithms.search_result import SearchResult, SearchStatus
+from graphs.csr import CSRGraph
+
+Item = TypeVar("Item")
+
+
+def meet_in_the_middle(start: Item, goal: Item, key: Callable[[Item], Hashable],
+                       forward_neighbours: Callable[[Item], Iterable[tuple[Item, int | float]]],
+                       backward_neighbours: Callable[[Item], Iterable[tuple[Item, int | float]]]
+                       ) -> tuple[int | float | None, list[Item] | None, int]:
+    """
+    The bidirectional search itself, on any items: key(item) identifies the node an item stands for,
+    and the neighbours functions give the (item, edge cost) pairs out of (forwards) or into (backwards) a node.
+    Returns the optimal cost (None if the goal can't be reached), the items on the path, and the number of nodes settled.
+    """
+    if key(start) == key(goal):
+        return 0, [start], 0
+    neighbours = (forward_neighbours, backward_neighbours)
+    distances: tuple[dict, dict] = ({key(start): 0}, {key(goal): 0})
+    parents: tuple[dict, dict] = ({key(start): None}, {key(goal): None})
+    items: tuple[dict, dict] = ({key(start): start}, {key(goal): goal})
+    counter = count()
+    heaps: tuple[list, list] = ([(0, next(counter), start)], [(0, next(counter), goal)])
+    best: int | float = float('inf')
+    meeting_key: Hashable | None = None
+    settled_count = 0
+    side = 0
+
+    def top(direction: int) -> int | float:
+        # the smallest live path cost in a frontier, after discarding stale entries
+        heap, side_distances = heaps[direction], distances[direction]
+        while heap and heap[0][0] > side_distances[key(heap[0][2])]:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else float('inf')
+
+    while True:
+        top_forward, top_backward = top(0), top(1)
+        if top_forward + top_backward >= best:
+            break
+        # alternate between the sides, unless one of them has run out
+        if top(side) == float('inf'):
+            side = 1 - side
+        path_cost, _, item = heapq.heappop(heaps[side])
+        settled_count += 1
+        item_key = key(item)
+        side_distances, other_distances = distances[side], distances[1 - side]
+        for child, cost in neighbours[side](item):
+            child_key = key(child)
+            child_cost = path_cost + cost
+            if child_key not in side_distances or child_cost < side_distances[child_key]:
+                side_distances[child_key] = child_cost
+                parents[side][child_key] = item_key
+                items[side][child_key] = child
+                heapq.heappush(heaps[side], (child_cost, next(counter), child))
+                if child_key in other_distances and child_cost + other_distances[child_key] < best:
+                    best = child_cost + other_distances[child_key]
+                    meeting_key = child_key
+        side = 1 - side
+
+    if meeting_key is None:
+        return None, None, settled_count
+    # start --> meeting node, then meeting node --> goal
+    path = []
+    path_key = meeting_key
+    while path_key is not None:
+        path.append(items[0][path_key])
+        path_key = parents[0][path_key]
+    path.reverse()
+    path_key = parents[1][meeting_key]
+    while path_key is not None:
+        path.append(items[1][path_key])
+        path_key = parents[1][path_key]
+    return best, path, settled_count
+
+
+class BidirectionalTraverser:
+    """
+    A bidirectional version of dijkstra.Traverser, on a CSRGraph snapshot of the graph.
+    For a directed graph the backward search follows edges in reverse, from a second CSRGraph of the reversed graph:
+    made here from a networkx DiGraph, but a directed CSRGraph needs its reverse_graph passed in.
+    """
+    graph: CSRGraph
+    reverse_graph: CSRGraph # the same object as graph for undirected graphs
+    start_index: int
+    goal_index: int
+    settled_count: int
+
+    def __init__(self, graph: Graph | CSRGraph, start_node_id: Hashable, goal_node_id: Hashable,
+                 reverse_graph: CSRGraph | None = None):
+        if not isinstance(graph, CSRGraph):
+            if graph.is_directed() and reverse_graph is None:
+                reverse_graph = CSRGraph.from_networkx(graph.reverse(copy=False))
+            graph = CSRGraph.from_networkx(graph)
+        elif graph.directed and reverse_graph is None:
+            raise ValueError("a directed CSRGraph needs reverse_graph, a CSRGraph of the reversed graph")
+        self.graph = graph
+        self.reverse_graph = reverse_graph if reverse_graph is not None else graph
+        self.start_index = graph.index_of[start_node_id]
+        self.goal_index = graph.index_of[goal_node_id]
+        self.settled_count = 0
+
+    def solve(self) -> SearchResult:
+        cost, path, self.settled_count = meet_in_the_middle(
+            self.start_index, self.goal_index, int,
+            lambda index: self.neighbours(self.graph, index),
+            lambda index: self.neighbours(self.reverse_graph, index),
+        )
+        if cost is None:
+            return SearchResult(SearchStatus.FAILURE, expanded=self.settled_count)
+        return SearchResult(SearchStatus.SUCCESS, cost, expanded=self.settled_count,
+                            path_builder=lambda: [self.graph.node_ids[index] for index in path])
+
+    @staticmethod
+    def neighbours(graph: CSRGraph, index: int) -> Iterable[tuple[int, int | float]]:
+        start, end = graph.indptr[index], graph.indptr[index + 1]
+        return zip(graph.indices[start:end].tolist(), graph.weights[start:end].tolist())
+
+
+class BidirectionalSolver:
+    """
+    A bidirectional search for the sliding tile puzzles, taking the same Problem as a_star.Solver.
+    Every move costs 1 and is undone by the opposite move, so the backward search makes the same moves as the forward one.
+    """
+    problem: Problem
+    settled_count: int
+
+    def __init__(self, problem: Problem):
+        self.problem = problem
+        self.settled_count = 0
+
+    def solve(self) -> SearchResult:
+        if not is_solvable(self.problem.start_node, self.problem.goal_node):
+            return SearchResult(SearchStatus.UNSOLVABLE)
+        cost, path, self.settled_count = meet_in_the_middle(
+            self.problem.start_node, self.problem.goal_node, lambda state: state.state_id,
+            self.neighbours, self.neighbours,
+        )
+        if cost is None:
+            return SearchResult(SearchStatus.FAILURE, expanded=self.settled_count)
+        return SearchResult(SearchStatus.SUCCESS, cost, expanded=self.settled_count,
+                            path_builder=lambda: [str(state) for state in path])
+
+    def neighbours(self, state: StateNode) -> Iterable[tuple[StateNode, int]]:
+        for _, swap_index in self.problem.moves[state.blank_index]:
+            yield self.problem.apply(state, swap_index), 1
+
+
+if __name__ == "__main__":
+    from algorithms.dijkstra import G
+
+    result_1 = BidirectionalTraverser(G, "A", "C").solve()
+    print(result_1)
+    assert result_1.cost == 12
+
+    start_node_2 = StateNode.from_tiles("283164705")
+    goal_node_2 = StateNode.from_tiles("123804765")
+    result_2 = BidirectionalSolver(Problem(start_node_2, goal_node_2)).solve()
+    print(result_2)
+    assert result_2.cost == 5
+    print("done.")
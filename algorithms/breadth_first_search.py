@@ -36,8 +36,16 @@ version 2 (from https://www.youtube.com/watch?v=-yF6k_bV_JQ):
 (see https://monosketch.io/ for ASCII drawing tool)
 """
 
+import logging
+from collections import deque
+from typing import Callable, Iterator
+
+from graphs.compact_tree import CompactNode, CompactTree, as_node
 from graphs.node import Node
 
+# NOTE: the traversers log instead of printing (see the note on the logger in a_star.py)
+logger = logging.getLogger(__name__)
+
 # build a graph of Nodes
 parent_node = Node(0, [])
 parent_node.children = [
@@ -76,39 +84,66 @@ parent_node_2.children = [
 # traverse the graph using breadth first search
 
 class Traverser:
+    """
+    Iterative breadth first search: the queue is a deque of (node, depth) pairs, so each visit is an
+    O(1) popleft() and there is no recursion, however big the tree.
+    - is_goal: called on each node as it is visited. The search stops at the first node it accepts.
+    - max_depth: children deeper than this are not queued (the start node is depth 0).
+    visit() collects the visited nodes in self.visited; walk() yields them one at a time instead,
+    for trees too big to keep a list of. Either takes a Node tree or a CompactTree.
+    NOTE: nodes are not checked for repeats, so a node reachable along two paths is visited twice
+     (this is a tree search).
+    """
     visited: list[Node]
-    queue: list[Node]
+    queue: deque[tuple[Node, int]]
     goal_met: bool
+    goal_node: Node | None
+    is_goal: Callable[[Node], bool] | None
+    max_depth: int | None
 
-    def __init__(self):
+    def __init__(self, is_goal: Callable[[Node], bool] | None = None, max_depth: int | None = None):
         self.visited = []
-        self.queue = []
+        self.queue = deque()
         self.goal_met = False
+        self.goal_node = None
+        self.is_goal = is_goal
+        self.max_depth = max_depth
 
-    def visit(self, current_node: Node):
-        self.visited.append(current_node)
-        self.queue.extend(current_node.children)
-
-        # TODO: evaluate a goal or goals here.
-
-        if len(self.queue) != 0:
-            # self.print_queue()
-            self.visit(self.queue.pop(0))
-        else:
-            print(f'BFS Traversal complete.')
-
+    def walk(self, start_node: Node | CompactNode | CompactTree) -> Iterator[tuple[Node, int]]:
+        # yields (node, depth) for each node as it is visited, in breadth first order
+        self.queue = deque([(as_node(start_node), 0)])
+        self.goal_met = False
+        self.goal_node = None
+        queue, is_goal, max_depth = self.queue, self.is_goal, self.max_depth
+        while queue:
+            current_node, depth = queue.popleft()
+            yield current_node, depth
+            if is_goal is not None and is_goal(current_node):
+                self.goal_met = True
+                self.goal_node = current_node
+                return
+            if max_depth is None or depth < max_depth:
+                queue.extend((child, depth + 1) for child in current_node.children)
+
+    def visit(self, current_node: Node | CompactNode | CompactTree) -> Node | None:
+        # visit every node from current_node (or up to the goal), returning the goal node if one was found
+        for node, _ in self.walk(current_node):
+            self.visited.append(node)
+        logger.info("BFS Traversal complete.")
+        return self.goal_node
 
     def print_history(self):
-        output: list = [x.node_id for x in self.visited]
-        print(f'Path from parent_node: {output}')
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Path from parent_node: %s", [x.node_id for x in self.visited])
 
 
     def print_queue(self):
-        output: list = [x.node_id for x in self.queue]
-        print(f'current queue: {output}')
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("current queue: %s", [x.node_id for x, _ in self.queue])
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     bfs_traverser = Traverser()
     bfs_traverser.visit(parent_node)
     bfs_traverser.print_history()
@@ -120,3 +155,25 @@ if __name__ == "__main__":
     bfs_traverser_2.print_history()
     traversed_ids = [x.node_id for x in bfs_traverser_2.visited]
     assert traversed_ids == ["A", "B", "C", "D", "E", "F", "N", "G", "H", "I", "J", "K"] # breadth first order
+
+    # the same walk on a CompactTree
+    bfs_traverser_5 = Traverser()
+    bfs_traverser_5.visit(CompactTree.from_node(parent_node_2))
+    assert [x.node_id for x in bfs_traverser_5.visited] == ["A", "B", "C", "D", "E", "F", "N", "G", "H", "I", "J", "K"]
+
+    # stop at the first node with no children
+    bfs_traverser_3 = Traverser(is_goal=lambda node: not node.children)
+    goal_node_3 = bfs_traverser_3.visit(parent_node_2)
+    assert bfs_traverser_3.goal_met and goal_node_3.node_id == "E"
+    assert [x.node_id for x in bfs_traverser_3.visited] == ["A", "B", "C", "D", "E"]
+
+    bfs_traverser_4 = Traverser(max_depth=1)
+    assert [node.node_id for node, _ in bfs_traverser_4.walk(parent_node_2)] == ["A", "B", "C", "D"]
+
+    # a chain a million nodes deep
+    chain_node = Node(0)
+    for node_id in range(1, 1_000_000):
+        chain_node = Node(node_id, [chain_node])
+    deepest_node, deepest = next(
+        (node, depth) for node, depth in Traverser().walk(chain_node) if not node.children)
+    assert deepest_node.node_id == 0 and deepest == 999_999
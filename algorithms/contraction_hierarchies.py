@@ -0,0 +1,296 @@
+"""
+Contraction hierarchies (CH) for fast shortest path queries on a static, undirected, weighted graph
+(the networkx Graphs dijkstra.Traverser takes).
+
+Preprocessing (ContractionHierarchy.build()) removes ("contracts") the nodes one at a time, from the
+least to the most important. Removing a node v would break the shortest paths that go u --> v --> w
+between its neighbours, so for each such pair a shortcut edge u --> w is added, with the weight of
+the path through v, unless a witness search (a small, bounded Dijkstra search from u that avoids v)
+finds another path from u to w that is no longer.
+The contraction order is chosen greedily by edge difference (shortcuts added minus edges removed),
+plus the number of neighbours already contracted (which spreads the contraction evenly over the
+graph). Priorities go stale as neighbours are contracted, so they are updated lazily: a node is only
+contracted if its recomputed priority is still the smallest.
+
+Every node ends up with a rank (its position in the order), and every shortest path in the graph
+has a shortest path in the graph plus shortcuts that first goes only up in rank and then only down.
+So a query (CHTraverser) is a bidirectional Dijkstra search in which both sides only follow edges to
+higher ranked nodes. Both searches stay small (they climb to the top of the hierarchy quickly),
+and the path is unpacked by replacing each shortcut with the two edges it stands for, recursively.
+
+The hierarchy is stored as a CSR graph of the upward edges (with the middle node of each shortcut),
+and can be saved to and loaded from an .npz file.
+NOTE: the node ids are stored as a NumPy object array, which load() unpickles, so only load files
+ you built yourself.
+"""
+from __future__ import annotations
+
+import heapq
+from pathlib import Path
+from typing import Hashable
+
+import numpy as np
+from networkx.classes import Graph
+
+from algorithms.search_result import SearchResult, SearchStatus
+from graphs.csr import CSRGraph
+
+
+class ContractionHierarchy:
+    node_ids: list[Hashable]
+    index_of: dict[Hashable, int]
+    rank: np.ndarray # rank[v] = the position of node index v in the contraction order
+    # the upward edges (to higher ranked nodes) in CSR form, see graphs/csr.py. up_middle is the
+    # node index a shortcut skips over, or -1 for an edge of the original graph.
+    up_indptr: np.ndarray
+    up_indices: np.ndarray
+    up_weights: np.ndarray
+    up_middle: np.ndarray
+
+    def __init__(self, node_ids: list[Hashable], rank: np.ndarray, up_indptr: np.ndarray, up_indices: np.ndarray,
+                 up_weights: np.ndarray, up_middle: np.ndarray):
+        self.node_ids = node_ids
+        self.index_of = {node_id: index for index, node_id in enumerate(node_ids)}
+        self.rank = rank
+        self.up_indptr = up_indptr
+        self.up_indices = up_indices
+        self.up_weights = up_weights
+        self.up_middle = up_middle
+
+    @property
+    def shortcut_count(self) -> int:
+        return int(np.count_nonzero(self.up_middle >= 0))
+
+    @classmethod
+    def build(cls, graph: Graph | CSRGraph, witness_settle_limit: int = 50) -> ContractionHierarchy:
+        """
+        Contract every node of an undirected graph. witness_settle_limit caps the nodes each witness
+        search settles: a smaller limit builds faster but may add shortcuts that aren't needed.
+        """
+        if not isinstance(graph, CSRGraph):
+            graph = CSRGraph.from_networkx(graph)
+        if graph.directed:
+            raise ValueError("contraction hierarchies here are for undirected graphs")
+        return Contractor(graph, witness_settle_limit).contract()
+
+    def save(self, path: str | Path) -> None:
+        node_ids = np.empty(len(self.node_ids), dtype=object)
+        for index, node_id in enumerate(self.node_ids):
+            node_ids[index] = node_id
+        np.savez(path, node_ids=node_ids, rank=self.rank, up_indptr=self.up_indptr, up_indices=self.up_indices,
+                 up_weights=self.up_weights, up_middle=self.up_middle)
+
+    @classmethod
+    def load(cls, path: str | Path) -> ContractionHierarchy:
+        with np.load(path, allow_pickle=True) as arrays:
+            return cls(arrays["node_ids"].tolist(), arrays["rank"], arrays["up_indptr"], arrays["up_indices"],
+                       arrays["up_weights"], arrays["up_middle"])
+
+    def middle_of(self, index_1: int, index_2: int) -> int:
+        # the middle node of the edge between two node indexes (-1 for an original edge).
+        # The edge is stored once, as an upward edge of its lower ranked end.
+        lower, upper = (index_1, index_2) if self.rank[index_1] < self.rank[index_2] else (index_2, index_1)
+        start, end = self.up_indptr[lower], self.up_indptr[lower + 1]
+        position = start + self.up_indices[start:end].tolist().index(upper)
+        return int(self.up_middle[position])
+
+
+class Contractor:
+    """
+    The state of the graph while it is being contracted: adjacency dicts for the nodes not yet
+    contracted, plus the middle node of every shortcut added so far.
+    """
+    adjacency: list[dict[int, int | float]]
+    middle: dict[tuple[int, int], int] # (lower index, higher index) --> the node a shortcut skips over
+    deleted_neighbours: list[int]
+    witness_settle_limit: int
+    node_ids: list[Hashable]
+
+    def __init__(self, graph: CSRGraph, witness_settle_limit: int):
+        self.node_ids = graph.node_ids
+        self.witness_settle_limit = witness_settle_limit
+        self.adjacency = [{} for _ in range(graph.node_count)]
+        indptr, indices, weights = graph.indptr.tolist(), graph.indices.tolist(), graph.weights.tolist()
+        for node in range(graph.node_count):
+            neighbours = self.adjacency[node]
+            for position in range(indptr[node], indptr[node + 1]):
+                neighbour, weight = indices[position], weights[position]
+                # no self loops, and only the lightest of parallel edges
+                if neighbour != node and (neighbour not in neighbours or weight < neighbours[neighbour]):
+                    neighbours[neighbour] = weight
+        self.middle = {}
+        self.deleted_neighbours = [0] * graph.node_count
+
+    def contract(self) -> ContractionHierarchy:
+        node_count = len(self.adjacency)
+        rank = np.zeros(node_count, dtype=np.int64)
+        # the upward edges of each node: its neighbours when it is contracted
+        up_edges: list[list[tuple[int, int | float, int]]] = [[] for _ in range(node_count)]
+        queue = []
+        for node in range(node_count):
+            queue.append((self.priority(node, self.shortcuts(node)), node))
+        heapq.heapify(queue)
+        next_rank = 0
+        while queue:
+            _, node = heapq.heappop(queue)
+            shortcuts = self.shortcuts(node)
+            priority = self.priority(node, shortcuts)
+            if queue and priority > queue[0][0]:
+                # lazy update: the node's priority has gone up since it was queued
+                heapq.heappush(queue, (priority, node))
+                continue
+            for neighbour_1, neighbour_2, weight in shortcuts:
+                if weight < self.adjacency[neighbour_1].get(neighbour_2, float('inf')):
+                    self.adjacency[neighbour_1][neighbour_2] = weight
+                    self.adjacency[neighbour_2][neighbour_1] = weight
+                    self.middle[edge_key(neighbour_1, neighbour_2)] = node
+            for neighbour, weight in self.adjacency[node].items():
+                up_edges[node].append((neighbour, weight, self.middle.get(edge_key(node, neighbour), -1)))
+                del self.adjacency[neighbour][node]
+                self.deleted_neighbours[neighbour] += 1
+            self.adjacency[node] = {}
+            rank[node] = next_rank
+            next_rank += 1
+
+        up_indptr = np.zeros(node_count + 1, dtype=np.int64)
+        np.cumsum([len(edges) for edges in up_edges], out=up_indptr[1:])
+        flat = [edge for edges in up_edges for edge in edges]
+        up_indices = np.array([edge[0] for edge in flat], dtype=np.int64)
+        up_weights = np.array([edge[1] for edge in flat])
+        up_middle = np.array([edge[2] for edge in flat], dtype=np.int64)
+        return ContractionHierarchy(self.node_ids, rank, up_indptr, up_indices, up_weights, up_middle)
+
+    def priority(self, node: int, shortcuts: list) -> int:
+        return len(shortcuts) - len(self.adjacency[node]) + self.deleted_neighbours[node]
+
+    def shortcuts(self, node: int) -> list[tuple[int, int, int | float]]:
+        # the shortcuts contracting the node would need: (neighbour, neighbour, weight) for each pair with no witness
+        neighbours = list(self.adjacency[node].items())
+        shortcuts = []
+        for position, (neighbour_1, weight_1) in enumerate(neighbours):
+            via_node = {neighbour_2: weight_1 + weight_2 for neighbour_2, weight_2 in neighbours[position + 1:]}
+            if not via_node:
+                continue
+            witnesses = self.witness_search(neighbour_1, node, max(via_node.values()))
+            for neighbour_2, weight in via_node.items():
+                if witnesses.get(neighbour_2, float('inf')) > weight:
+                    shortcuts.append((neighbour_1, neighbour_2, weight))
+        return shortcuts
+
+    def witness_search(self, source: int, avoid: int, limit: int | float) -> dict[int, int | float]:
+        """
+        A Dijkstra search from source that never passes through avoid, and stops at distance limit or after
+        witness_settle_limit nodes. Every distance it returns is the length of a real path (if not always the shortest).
+        """
+        distances = {source: 0}
+        queue = [(0, source)]
+        settled = 0
+        while queue and settled < self.witness_settle_limit:
+            distance, node = heapq.heappop(queue)
+            if distance > distances[node]:
+                continue
+            settled += 1
+            for neighbour, weight in self.adjacency[node].items():
+                neighbour_distance = distance + weight
+                if (neighbour != avoid and neighbour_distance <= limit
+                        and neighbour_distance < distances.get(neighbour, float('inf'))):
+                    distances[neighbour] = neighbour_distance
+                    heapq.heappush(queue, (neighbour_distance, neighbour))
+        return distances
+
+
+def edge_key(index_1: int, index_2: int) -> tuple[int, int]:
+    return (index_1, index_2) if index_1 < index_2 else (index_2, index_1)
+
+
+class CHTraverser:
+    """
+    A shortest path query on a ContractionHierarchy: bidirectional Dijkstra following upward edges only.
+    """
+    hierarchy: ContractionHierarchy
+    start_index: int
+    goal_index: int
+    settled_count: int
+
+    def __init__(self, hierarchy: ContractionHierarchy, start_node_id: Hashable, goal_node_id: Hashable):
+        self.hierarchy = hierarchy
+        self.start_index = hierarchy.index_of[start_node_id]
+        self.goal_index = hierarchy.index_of[goal_node_id]
+        self.settled_count = 0
+
+    def solve(self) -> SearchResult:
+        hierarchy = self.hierarchy
+        indptr, indices, weights = hierarchy.up_indptr, hierarchy.up_indices, hierarchy.up_weights
+        distances: tuple[dict, dict] = ({self.start_index: 0}, {self.goal_index: 0})
+        parents: tuple[dict, dict] = ({self.start_index: -1}, {self.goal_index: -1})
+        queues: tuple[list, list] = ([(0, self.start_index)], [(0, self.goal_index)])
+        best: int | float = float('inf')
+        meeting_index = -1
+        self.settled_count = 0
+        while queues[0] or queues[1]:
+            for side in (0, 1):
+                queue = queues[side]
+                if not queue:
+                    continue
+                distance, index = heapq.heappop(queue)
+                if distance > distances[side][index]:
+                    continue
+                if distance >= best:
+                    # nothing left on this side can lead to a shorter path
+                    queue.clear()
+                    continue
+                self.settled_count += 1
+                other_distance = distances[1 - side].get(index)
+                if other_distance is not None and distance + other_distance < best:
+                    best = distance + other_distance
+                    meeting_index = index
+                start, end = indptr[index], indptr[index + 1]
+                for child, weight in zip(indices[start:end].tolist(), weights[start:end].tolist()):
+                    child_distance = distance + weight
+                    if child_distance < distances[side].get(child, float('inf')):
+                        distances[side][child] = child_distance
+                        parents[side][child] = index
+                        heapq.heappush(queue, (child_distance, child))
+        if meeting_index == -1:
+            return SearchResult(SearchStatus.FAILURE, expanded=self.settled_count)
+        # start --> meeting node, then meeting node --> goal, in the graph with shortcuts
+        up_path = []
+        index = meeting_index
+        while index != -1:
+            up_path.append(index)
+            index = parents[0][index]
+        up_path.reverse()
+        index = parents[1][meeting_index]
+        while index != -1:
+            up_path.append(index)
+            index = parents[1][index]
+        # unpacking the shortcuts is most of the work of a query, so it waits until the path is asked for
+        return SearchResult(SearchStatus.SUCCESS, best, expanded=self.settled_count,
+                            path_builder=lambda: [hierarchy.node_ids[index] for index in self.unpack(up_path)])
+
+    def unpack(self, up_path: list[int]) -> list[int]:
+        # replace each shortcut with the two edges it skips over, until only original edges are left
+        path = [up_path[0]]
+        for edge in zip(up_path, up_path[1:]):
+            stack = [edge]
+            while stack:
+                index_1, index_2 = stack.pop()
+                middle = self.hierarchy.middle_of(index_1, index_2)
+                if middle == -1:
+                    path.append(index_2)
+                else:
+                    # the second half goes on the stack first, so the first half is unpacked first
+                    stack.append((middle, index_2))
+                    stack.append((index_1, middle))
+        return path
+
+
+if __name__ == "__main__":
+    from algorithms.dijkstra import G
+
+    hierarchy_1 = ContractionHierarchy.build(G)
+    print(f"contraction order: {sorted(hierarchy_1.node_ids, key=lambda node_id: hierarchy_1.rank[hierarchy_1.index_of[node_id]])}")
+    result_1 = CHTraverser(hierarchy_1, "A", "C").solve()
+    print(result_1)
+    assert result_1.cost == 12
+    print("done.")
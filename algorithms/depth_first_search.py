@@ -35,8 +35,16 @@ version 2 (from https://www.youtube.com/watch?v=-yF6k_bV_JQ):
 
 (see https://monosketch.io/ for ASCII drawing tool)
 """
+import logging
+from enum import Enum
+from typing import Callable, Iterator
+
+from graphs.compact_tree import CompactNode, CompactTree, as_node
 from graphs.node import Node
 
+# NOTE: the traversers log instead of printing (see the note on the logger in a_star.py)
+logger = logging.getLogger(__name__)
+
 # build a graph of Nodes
 parent_node = Node(0, [])
 parent_node.children = [
@@ -74,28 +82,96 @@ parent_node_2.children = [
 
 # traverse the graph using depth first search
 
+class Event(Enum):
+    PRE_ORDER = "pre" # a node is entered, before any of its children
+    POST_ORDER = "post" # a node is left, after all of its children
+
+
 class Traverser:
+    """
+    Iterative depth first search with an explicit stack: one (node, depth, children left) entry per
+    level of the current branch, so memory grows with the depth of the tree, not its size.
+    - events() yields (Event, node, depth) as the walk enters and leaves each node, and keeps nothing else.
+    - walk() collects the pre-order nodes in self.history, as before.
+    - prune(node, depth): return True to skip a node's children (the node itself is still visited).
+    - max_depth: children deeper than this are skipped (the start node is depth 0).
+    - iterative_deepening(): depth limited walks with limits 0, 1, 2, ... until a goal is found.
+    The tree can be a Node tree or a CompactTree.
+    """
     start_node: Node
     history: list[Node]
-    def __init__(self, start_node: Node):
-        self.start_node = start_node
+    prune: Callable[[Node, int], bool] | None
+    max_depth: int | None
+    cut_off: bool # whether the last walk skipped any children for being deeper than max_depth
+
+    def __init__(self, start_node: Node | CompactNode | CompactTree, prune: Callable[[Node, int], bool] | None = None,
+                 max_depth: int | None = None):
+        self.start_node = as_node(start_node)
         self.history = []
+        self.prune = prune
+        self.max_depth = max_depth
+        self.cut_off = False
+
+    def events(self, from_node: Node | None = None, max_depth: int | None = None) -> Iterator[tuple[Event, Node, int]]:
+        from_node = self.start_node if from_node is None else as_node(from_node)
+        if max_depth is None:
+            max_depth = self.max_depth
+        prune = self.prune
+        self.cut_off = False
+        stack: list[tuple[Node, int, Iterator[Node]]] = []
+
+        def enter(node: Node, depth: int) -> None:
+            # children are only pulled from the iterator as the walk reaches them
+            if prune is not None and prune(node, depth):
+                children = iter(())
+            elif max_depth is not None and depth >= max_depth:
+                self.cut_off = self.cut_off or bool(node.children)
+                children = iter(())
+            else:
+                children = iter(node.children)
+            stack.append((node, depth, children))
+
+        yield Event.PRE_ORDER, from_node, 0
+        enter(from_node, 0)
+        while stack:
+            node, depth, children = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                yield Event.POST_ORDER, node, depth
+            else:
+                yield Event.PRE_ORDER, child, depth + 1
+                enter(child, depth + 1)
 
     def walk(self, from_node=None):
-        if from_node is None:
-            from_node = self.start_node
-        self.history.append(from_node)
-        for node in from_node.children:
-           self.walk(node)
-        if from_node == self.start_node:
-           print(f'DFS traversal complete.')
-           self.print_history()
+        for event, node, _ in self.events(from_node):
+            if event is Event.PRE_ORDER:
+                self.history.append(node)
+        logger.info("DFS traversal complete.")
+        self.print_history()
+
+    def iterative_deepening(self, is_goal: Callable[[Node], bool], max_depth: int | None = None) -> Node | None:
+        """
+        Depth limited walks with limits 0, 1, 2, ... (up to max_depth): the first goal found is one of the
+        shallowest, as with BFS, while memory stays bounded by the depth. None if there is no goal.
+        """
+        depth_limit = 0
+        while max_depth is None or depth_limit <= max_depth:
+            for event, node, _ in self.events(max_depth=depth_limit):
+                if event is Event.PRE_ORDER and is_goal(node):
+                    return node
+            if not self.cut_off:
+                # the whole tree fit under the limit
+                return None
+            depth_limit += 1
+        return None
 
     def print_history(self):
-        output: list = [x.node_id for x in self.history]
-        print(f'Path from {self.start_node.node_id}: {output}')
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Path from %s: %s", self.start_node.node_id, [x.node_id for x in self.history])
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     dfs_traverser = Traverser(parent_node)
     dfs_traverser.walk()
     traversed_ids = [x.node_id for x in dfs_traverser.history]
@@ -108,3 +184,33 @@ if __name__ == "__main__":
     #  Should the deepest node in the tree be explored first, or just the deepest in the current branch?
     #  If the algorithm is rewritten with a frontier, is that proper DFS?
     assert traversed_ids == ['A', 'B', 'E', 'F', 'I', 'J', 'C', 'N', 'D', 'G', 'K', 'H'] # depth first order
+
+    # the same walk on a CompactTree
+    dfs_traverser = Traverser(CompactTree.from_node(parent_node_2))
+    dfs_traverser.walk()
+    assert [x.node_id for x in dfs_traverser.history] == ['A', 'B', 'E', 'F', 'I', 'J', 'C', 'N', 'D', 'G', 'K', 'H']
+
+    # post-order, without collecting anything
+    post_order_ids = [node.node_id for event, node, _ in Traverser(parent_node).events() if event is Event.POST_ORDER]
+    assert post_order_ids == [2, 4, 7, 1, 5, 6, 3, 0]
+
+    # skip the subtree under B
+    dfs_traverser = Traverser(parent_node_2, prune=lambda node, depth: node.node_id == "B")
+    dfs_traverser.walk()
+    assert [x.node_id for x in dfs_traverser.history] == ['A', 'B', 'C', 'N', 'D', 'G', 'K', 'H']
+
+    dfs_traverser = Traverser(parent_node_2, max_depth=1)
+    dfs_traverser.walk()
+    assert [x.node_id for x in dfs_traverser.history] == ['A', 'B', 'C', 'D']
+
+    # DFS order reaches I (depth 3) before N (depth 2), iterative deepening finds the shallower one
+    dfs_traverser = Traverser(parent_node_2)
+    assert dfs_traverser.iterative_deepening(lambda node: node.node_id in ("I", "N")).node_id == "N"
+    assert dfs_traverser.iterative_deepening(lambda node: node.node_id == "Z") is None
+
+    # a chain a million nodes deep
+    chain_node = Node(0)
+    for node_id in range(1, 1_000_000):
+        chain_node = Node(node_id, [chain_node])
+    deepest = max(depth for _, _, depth in Traverser(chain_node).events())
+    assert deepest == 999_999
@@ -19,6 +19,8 @@ https://monosketch.io/
 # in classes that are the type of the class itself)
 from __future__ import annotations
 
+import logging
+from functools import partial
 from typing import Hashable
 
 import matplotlib.pyplot as plt
@@ -26,6 +28,13 @@ import networkx as nx
 from networkx.classes import Graph
 from networkx.classes.reportviews import EdgeDataView
 
+from algorithms.priority_queues import BinaryHeapQueue, PriorityQueue, make_queue
+from algorithms.search_result import SearchResult, SearchStatus
+from graphs.csr import CSRGraph
+
+# NOTE: the traversers log instead of printing (see the note on the logger in a_star.py):
+#  the outcome and the path at INFO, the frontier on every add and the reached nodes at DEBUG.
+logger = logging.getLogger(__name__)
 # build the graph
 G: Graph = nx.Graph()
 G.add_nodes_from("ABCDEF")
@@ -75,6 +84,11 @@ def draw_graph():
     plt.show()
 
 
+def max_edge_weight(graph: Graph) -> int:
+    # the largest edge weight in the graph (sizes the bucket queue)
+    return max((weight for _, _, weight in graph.edges(data='weight')), default=0)
+
+
 class StateNode:
     """
     A Node in the underlying state data from the problem.
@@ -118,7 +132,8 @@ class Frontier:
     """
     The Frontier class for best-first-search.
     dijkstra.Frontier uses smallest path size for evaluation
-    and (in this example), a set (which is unordered) for storing nodes.
+    and a priority queue from algorithms.priority_queues for storing nodes
+    (a binary heap by default; a bucket queue or radix heap for integer edge weights).
     NOTE: in the networkx package, the type of a Node can be any hashable
     type, and it's more messy than it's worth (and at the cost of polymorphism)
     to restrict the type of the node itself in the classes in this module for
@@ -130,35 +145,48 @@ class Frontier:
     parts of the search graph (which may not even be the same shape as the
     underlying data graph), we can declare any type that suits us, including
     custom types.
+    NOTE: none of the queues support decrease-key. When a cheaper path to a state is found,
+     the cheaper SearchNode is added and supersedes the old one in `entries`; the old queue
+     entry is skipped as stale when it reaches the top (lazy deletion).
     """
-    nodes: set[SearchNode]
+    queue: PriorityQueue
+    entries: dict[Hashable, SearchNode] # the live SearchNode in the queue for each state
+    trace: bool # log the whole frontier on every add (DEBUG), checked once here rather than per add
 
-    def __init__(self):
-        self.nodes = set()
+    def __init__(self, queue: PriorityQueue | None = None):
+        self.queue = queue if queue is not None else BinaryHeapQueue()
+        self.entries = {}
+        self.trace = logger.isEnabledFor(logging.DEBUG)
 
     def is_empty(self):
-        return not self.nodes
+        return not self.entries
 
     def pop(self) -> SearchNode | None:
         # return the node in the frontier with the best score based on the evaluation function
-        # and remove it from the set.
-        top_node = self.top()
-        self.nodes.remove(top_node)
-        return top_node
+        # and remove it from the queue, discarding any stale entries on the way.
+        while self.queue:
+            node = self.queue.pop()[1]
+            if self.entries.get(node.state.state) is node:
+                del self.entries[node.state.state]
+                return node
+        return None
 
     def top(self) -> SearchNode | None:
         # return the node in the frontier with the best score (lowest cost, in the case of Dijkstra's
-        # algorithm) based on the evaluation function, but do not remove it from the set.
-        best_node = next(iter(self.nodes))
-        for node in self.nodes:
-            if self.evaluate(node) < best_node.path_cost:
-                best_node = node
-        return best_node
+        # algorithm) based on the evaluation function, but do not remove it from the queue.
+        while self.queue:
+            node = self.queue.peek()[1]
+            if self.entries.get(node.state.state) is node:
+                return node
+            self.queue.pop()
+        return None
 
     def add(self, node: SearchNode) -> None:
-        # add the node to the set (unordered, in this example)
-        self.nodes.add(node)
-        print(f"Frontier nodes:\n{self}")
+        # add the node to the queue, superseding any node already queued for the same state
+        self.entries[node.state.state] = node
+        self.queue.push(self.evaluate(node), node)
+        if self.trace:
+            logger.debug("Frontier nodes:\n%s", self)
 
     def evaluate(self, node: SearchNode) -> int:
         # The evaluation function f(n).
@@ -167,7 +195,7 @@ class Frontier:
 
     def __str__(self):
         output = ""
-        for node in self.nodes:
+        for node in self.entries.values():
             output += f"{node.state.state}, cost: {node.path_cost}\n"
         return output
 
@@ -186,33 +214,40 @@ class Traverser:
     # NOTE: (expanded nodes) ∪ (frontier nodes) == reached nodes
     start_node: SearchNode
     goal_node: SearchNode
+    expanded_count: int # nodes taken off the frontier and expanded
+    generated_count: int # children generated by expand()
 
-    def __init__(self, graph: Graph, start_node_id: Hashable, goal_node_id: Hashable):
+    def __init__(self, graph: Graph, start_node_id: Hashable, goal_node_id: Hashable,
+                 queue_type: str = "heap"):
         # NOTE: for Dijkstra's algorithm, the Graph (including weighted edges), start_node,
         #  and goal_node comprise the problem, alongside the assumption that every action
         #  involves traversing from one node to an adjacent node, and the action cost is
         #  the weight of the edge, and that the optimal solution involves the path with
         #  lowest cost.
+        # NOTE: queue_type selects the frontier's priority queue: "heap" works for any
+        #  non-negative weights, "bucket" (Dial) and "radix" need non-negative integer weights.
         self.graph = graph
         self.start_node = SearchNode(StateNode(start_node_id, graph.edges(start_node_id, data=True)), None, 0)
         self.goal_node = SearchNode(StateNode(goal_node_id, graph.edges(goal_node_id, data=True)), None, float('inf'))
-        self.frontier = Frontier()
+        self.frontier = Frontier(make_queue(queue_type, max_edge_weight(graph) if queue_type == "bucket" else None))
         self.frontier.add(self.start_node)
         self.reached = {self.start_node.state.state: self.start_node}
+        self.expanded_count = 0
+        self.generated_count = 0
 
-    def solve(self) -> None:
+    def solve(self) -> SearchResult:
         while not self.frontier.is_empty():
             # visit phase
             current_node = self.frontier.pop()
             if current_node.state.state == self.goal_node.state.state:
-                self.finish(True, current_node)
-                return
+                return self.finish(True, current_node)
             # expand phase
+            self.expanded_count += 1
             for child_node in self.expand(current_node):
                 if child_node.state.state not in self.reached.keys() or child_node.path_cost < self.reached[child_node.state.state].path_cost:
                     self.reached[child_node.state.state] = child_node
                     self.frontier.add(child_node)
-        self.finish(False, None)
+        return self.finish(False, None)
 
     def expand(self, node: SearchNode) -> set[SearchNode]:
         expanded: set = set()
@@ -220,33 +255,106 @@ class Traverser:
             path_cost = node.path_cost + edge_data['weight']
             child_node = SearchNode(StateNode(child_id, self.graph.edges(child_id, data=True)), node, path_cost)
             expanded.add(child_node)
+        self.generated_count += len(expanded)
         return expanded
 
-    def finish(self, success: bool, last_node):
+    def finish(self, success: bool, last_node: SearchNode | None) -> SearchResult:
+        counters = {"expanded": self.expanded_count, "generated": self.generated_count}
         if success:
-            print(f'success!')
-            print(f'reached goal node: {last_node.state.state}')
-            print(f"goal node cost: {last_node.path_cost}")
-            solution_path: list[Hashable] = []
-            path_node = last_node
-            reached_start = False
-            while not reached_start:
-                solution_path.append(path_node.state.state)
-                if not path_node.parent:
-                    reached_start = True
-                else:
-                    path_node = path_node.parent
-            solution_path.reverse()
-            print(f"path to goal: {solution_path}")
-        else:
-            print(f'finished without success.')
-            print(f"reached nodes:")
-            for key, value in self.reached.items():
-                print(f"{key}, cost: {value.path_cost}")
+            result = SearchResult(SearchStatus.SUCCESS, last_node.path_cost,
+                                  path_builder=partial(self.path_to, last_node), **counters)
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("success! reached goal node: %s, goal node cost: %s",
+                            last_node.state.state, last_node.path_cost)
+                logger.info("path to goal: %s", result.path)
+            return result
+        logger.info("finished without success.")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("reached nodes:\n%s", "\n".join(f"{key}, cost: {value.path_cost}"
+                                                         for key, value in self.reached.items()))
+        return SearchResult(SearchStatus.FAILURE, **counters)
+
+    @staticmethod
+    def path_to(last_node: SearchNode) -> list[Hashable]:
+        # the node ids from the start to last_node, by following the parents back
+        solution_path: list[Hashable] = []
+        path_node = last_node
+        while path_node is not None:
+            solution_path.append(path_node.state.state)
+            path_node = path_node.parent
+        solution_path.reverse()
+        return solution_path
+
+
+class CompiledTraverser:
+    """
+    Dijkstra's algorithm on a CSRGraph snapshot of the graph (see graphs/csr.py).
+    The search runs entirely on integer node indices: instead of StateNodes, SearchNodes and
+    edge data dicts, it keeps the best known distance and the parent index of each reached node.
+    The original node ids are only looked up to build the returned path.
+    NOTE: converting a networkx graph is a one-time O(V + E) cost. To run many queries against
+     the same graph, build the CSRGraph once and pass it in instead of the networkx Graph.
+    """
+    graph: CSRGraph
+    start_index: int
+    goal_index: int
+    queue_type: str
+
+    def __init__(self, graph: Graph | CSRGraph, start_node_id: Hashable, goal_node_id: Hashable,
+                 queue_type: str = "heap"):
+        if not isinstance(graph, CSRGraph):
+            graph = CSRGraph.from_networkx(graph)
+        self.graph = graph
+        self.start_index = graph.index_of[start_node_id]
+        self.goal_index = graph.index_of[goal_node_id]
+        self.queue_type = queue_type
+
+    def solve(self) -> SearchResult:
+        indptr, indices, weights = self.graph.indptr, self.graph.indices, self.graph.weights
+        queue = make_queue(self.queue_type,
+                           int(self.graph.max_weight()) if self.queue_type == "bucket" else None)
+        # distances and parents are only kept for the nodes the search reaches
+        distances: dict[int, int | float] = {self.start_index: 0}
+        parents: dict[int, int] = {self.start_index: -1}
+        queue.push(0, self.start_index)
+        expanded = generated = 0
+        while queue:
+            # visit phase
+            distance, index = queue.pop()
+            if distance > distances[index]:
+                # stale entry, the node was pushed again with a smaller distance
+                continue
+            if index == self.goal_index:
+                return SearchResult(SearchStatus.SUCCESS, distance, path_builder=partial(self.path_to, index, parents),
+                                    expanded=expanded, generated=generated)
+            # expand phase
+            start, end = indptr[index], indptr[index + 1]
+            expanded += 1
+            generated += int(end - start)
+            for child, weight in zip(indices[start:end].tolist(), weights[start:end].tolist()):
+                child_distance = distance + weight
+                if child not in distances or child_distance < distances[child]:
+                    distances[child] = child_distance
+                    parents[child] = index
+                    queue.push(child_distance, child)
+        return SearchResult(SearchStatus.FAILURE, expanded=expanded, generated=generated)
+
+    def path_to(self, index: int, parents: dict[int, int]) -> list[Hashable]:
+        solution_path: list[Hashable] = []
+        while index != -1:
+            solution_path.append(self.graph.node_ids[index])
+            index = parents[index]
+        solution_path.reverse()
+        return solution_path
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     dijkstra_traverser = Traverser(G, "A", "C")
-    dijkstra_traverser.solve()
+    dijkstra_result = dijkstra_traverser.solve()
+    assert dijkstra_result.cost == 12 and dijkstra_result.path[0] == "A" and dijkstra_result.path[-1] == "C"
+    compiled_result = CompiledTraverser(G, "A", "C").solve()
+    print(f"compiled traverser: {compiled_result}")
+    assert compiled_result.cost == 12
     draw_graph()
     print("done.")
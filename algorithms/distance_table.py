@@ -0,0 +1,167 @@
+"""
+A complete distance table for small sliding tile puzzles (the 8-puzzle and smaller boards).
+
+The 8-puzzle has 9! = 362,880 boards, and exactly half of them (181,440) can reach any given goal.
+That's small enough to search all of them once, breadth-first backwards from the goal, and store
+the exact number of moves to the goal for every board. After that:
+- the optimal cost of any board is one table lookup,
+- an optimal next move is a move to a neighbouring board one step closer (at most 4 lookups),
+- an optimal path follows next moves down to the goal (greedy descent).
+No search is needed at query time.
+
+Each board is stored at the rank of its permutation of tiles (its Lehmer code, see
+rank_permutation()), so the table is a flat byte array of n! entries with no keys: 355 KiB for
+the 8-puzzle. Boards that can't reach the goal hold UNREACHABLE.
+save() writes a small header and the table; load() memory-maps the file, so processes using the
+same table share one copy of it.
+
+NOTE: the table has n! entries for an n-square board, so this only makes sense up to 3x3
+ (or e.g. 4x3 at 479 MB, built very slowly). For larger boards see a_star.py and ida_star.py.
+"""
+from __future__ import annotations
+
+import mmap
+import struct
+from functools import partial
+from math import factorial
+from pathlib import Path
+
+from algorithms.a_star import MOVE_NAMES, Board, Problem, StateNode
+from algorithms.search_result import SearchResult, SearchStatus
+
+TABLE_MAGIC = b"DST1"
+# width, height
+TABLE_HEADER = struct.Struct("<4sBB")
+UNREACHABLE = 0xFF
+
+
+def rank_permutation(tiles: list[int]) -> int:
+    """
+    The Lehmer code of a permutation of 0..n-1, read as a factorial-base number: 0..n!-1.
+    Digit i is the number of tiles after position i that are smaller than tiles[i], i.e.
+    tiles[i] minus the number of smaller tiles already seen, counted with a bit mask.
+    e.g. [1, 2, 0] --> digits (1, 1, 0) --> 1 * 2! + 1 * 1! + 0 = 3
+    """
+    rank = 0
+    seen = 0
+    size = len(tiles)
+    for i, tile in enumerate(tiles):
+        rank = rank * (size - i) + tile - (seen & ((1 << tile) - 1)).bit_count()
+        seen |= 1 << tile
+    return rank
+
+
+class DistanceTable:
+    board: Board
+    goal_node: StateNode
+    distances: bytearray | memoryview # distances[rank_permutation(tiles)] = moves to the goal
+    mapped_file: mmap.mmap | None
+    mover: Problem # applies moves on the table's board
+
+    def __init__(self, goal_node: StateNode, distances: bytearray | memoryview, mapped_file: mmap.mmap | None = None):
+        self.board = goal_node.board
+        self.goal_node = goal_node
+        self.distances = distances
+        self.mapped_file = mapped_file
+        self.mover = Problem(goal_node, goal_node)
+
+    @classmethod
+    def build(cls, goal_node: StateNode) -> DistanceTable:
+        """
+        Breadth-first search over every board that can reach goal_node, one level at a time.
+        Moves are reversible, so the moves to reach the goal from a board = the moves to reach the board from the goal.
+        """
+        board = goal_node.board
+        tile_bits, tile_mask, move_table = board.tile_bits, board.tile_mask, board.moves
+        distances = bytearray([UNREACHABLE]) * factorial(board.size)
+        distances[rank_permutation(goal_node.tiles())] = 0
+        level = [(goal_node.state_id, goal_node.blank_index)]
+        distance = 0
+        while level:
+            distance += 1
+            next_level = []
+            for state_id, blank_index in level:
+                for _, swap_index in move_table[blank_index]:
+                    shift = swap_index * tile_bits
+                    tile = (state_id >> shift) & tile_mask
+                    child_id = state_id - (tile << shift) + (tile << (blank_index * tile_bits))
+                    rank = rank_permutation(board.unpack(child_id))
+                    if distances[rank] == UNREACHABLE:
+                        distances[rank] = distance
+                        next_level.append((child_id, swap_index))
+            level = next_level
+        return cls(goal_node, distances)
+
+    def save(self, path: str | Path) -> None:
+        with open(path, "wb") as file:
+            file.write(TABLE_HEADER.pack(TABLE_MAGIC, self.board.width, self.board.height))
+            file.write(bytes(self.goal_node.tiles()))
+            file.write(self.distances)
+
+    @classmethod
+    def load(cls, path: str | Path) -> DistanceTable:
+        with open(path, "rb") as file:
+            mapped_file = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, width, height = TABLE_HEADER.unpack_from(mapped_file)
+        if magic != TABLE_MAGIC:
+            raise ValueError(f"{path} is not a distance table file")
+        offset = TABLE_HEADER.size
+        size = width * height
+        goal_node = StateNode.from_tiles(list(mapped_file[offset:offset + size]), width, height)
+        distances = memoryview(mapped_file)[offset + size:]
+        if len(distances) != factorial(size):
+            raise ValueError(f"{path} has {len(distances)} entries, expected {factorial(size)}")
+        return cls(goal_node, distances, mapped_file)
+
+    def cost(self, state: StateNode) -> int | None:
+        # the optimal number of moves from state to the goal, or None if the goal can't be reached
+        distance = self.distances[rank_permutation(state.tiles())]
+        return None if distance == UNREACHABLE else distance
+
+    def next_move(self, state: StateNode) -> tuple[int, StateNode] | None:
+        # an optimal move from state (an index into MOVE_NAMES) and the board it leads to,
+        # or None if state is the goal or can't reach it
+        distance = self.cost(state)
+        if not distance:
+            return None
+        for move, swap_index in self.mover.moves[state.blank_index]:
+            child = self.mover.apply(state, swap_index)
+            if self.distances[rank_permutation(child.tiles())] == distance - 1:
+                return move, child
+        raise RuntimeError("the distance table is inconsistent: no neighbour is closer to the goal")
+
+    def solve(self, problem: Problem) -> SearchResult:
+        """
+        The same result as a_star.Solver(problem).solve(), by descending the table from the start.
+        """
+        if problem.board is not self.board or problem.goal_node.state_id != self.goal_node.state_id:
+            raise ValueError("the distance table was built for a different board or goal")
+        distance = self.cost(problem.start_node)
+        if distance is None:
+            return SearchResult(SearchStatus.UNSOLVABLE)
+        # the descent expands one board per move, when the path is read
+        return SearchResult(SearchStatus.SUCCESS, distance, expanded=distance,
+                            path_builder=partial(self.path_from, problem.start_node, distance))
+
+    def path_from(self, state: StateNode, distance: int) -> list[str]:
+        # the boards down the table from state (distance moves from the goal) to the goal
+        solution_path = [str(state)]
+        for _ in range(distance):
+            _, state = self.next_move(state)
+            solution_path.append(str(state))
+        return solution_path
+
+
+if __name__ == "__main__":
+    goal_node_1 = StateNode.from_tiles("123804765")
+    distance_table = DistanceTable.build(goal_node_1)
+    reachable = [distance for distance in distance_table.distances if distance != UNREACHABLE]
+    print(f"{len(reachable)} boards can reach {goal_node_1}, the furthest in {max(reachable)} moves")
+    assert len(reachable) == factorial(9) // 2
+
+    start_node_1 = StateNode.from_tiles("283164705")
+    result_1 = distance_table.solve(Problem(start_node_1, goal_node_1))
+    print(result_1)
+    assert result_1.cost == 5
+    print(f"first move: {MOVE_NAMES[distance_table.next_move(start_node_1)[0]]}")
+    print("done.")
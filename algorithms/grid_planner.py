@@ -0,0 +1,349 @@
+"""
+Path planning directly on a 2D occupancy grid (a NumPy array, nonzero/True = blocked), without
+building a networkx graph with one node per cell.
+
+Cells are (row, column) pairs. Moves:
+- connectivity=4: up, down, left, right, each costing 1.
+- connectivity=8: also the 4 diagonals, costing sqrt(2). A diagonal move is only allowed when both
+  cells it passes between are free (no cutting corners, or squeezing between two diagonal walls).
+
+Methods:
+- "a_star": A* with the Manhattan (4) or octile (8) distance as the heuristic.
+- "jps": Jump Point Search (Harabor & Grastien), 8-connected only. An open grid is full of
+  symmetric paths (the same moves in a different order), and A* expands all of them. JPS only
+  generates the neighbours an optimal path could continue to (pruning), and instead of stopping at
+  every cell, "jumps" in a straight line until it reaches a jump point: a cell with a forced
+  neighbour (one only reachable optimally through that cell, because a wall beside the line ends),
+  or the goal. Diagonal jumps stop at any cell from which a straight jump finds a jump point.
+  The pruning and jump rules are those of PathFinding.js' JPFMoveDiagonallyIfNoObstacles, which
+  match the corner rule above. Paths are as short as A*'s.
+- "jps+": JPS with the straight jumps precomputed: for each cell and each of the 4 straight
+  directions, the number of steps to the next jump point in that direction (or to the wall). Every
+  straight jump is then one table lookup (plus a check for the goal on the way), and a diagonal jump
+  costs two lookups per step. Only useful when many queries run on the same grid.
+
+The grid is copied once into a flat bytearray with a border of blocked cells, so cells are plain
+int indices (row + 1) * stride + (column + 1) and the searches need no bounds checks; g values and
+parents are kept in dicts, so a query only allocates for the cells it reaches.
+"""
+from __future__ import annotations
+
+import heapq
+from functools import partial
+from math import sqrt
+from typing import Iterable
+
+import numpy as np
+
+from algorithms.search_result import SearchResult, SearchStatus
+
+SQRT2 = sqrt(2)
+# (row step, column step)
+STRAIGHT_DIRECTIONS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+DIAGONAL_DIRECTIONS = ((-1, -1), (-1, 1), (1, -1), (1, 1))
+METHODS = ("a_star", "jps", "jps+")
+
+Cell = tuple[int, int]
+
+
+class GridPlanner:
+    height: int
+    width: int
+    stride: int # the width of the padded grid
+    free: bytearray # the padded grid, flattened: 1 for a free cell, 0 for a blocked one or the border
+    connectivity: int
+    method: str
+    # JPS+: jump_distances[direction][cell] for each of STRAIGHT_DIRECTIONS: k > 0 if the next jump point is
+    # k steps away, or -k if there is none and k free cells before the wall
+    jump_distances: list[list[int]] | None
+    expanded_count: int
+
+    def __init__(self, grid: np.ndarray, connectivity: int = 8, method: str = "a_star"):
+        if connectivity not in (4, 8):
+            raise ValueError(f"connectivity must be 4 or 8, not {connectivity}")
+        if method not in METHODS:
+            raise ValueError(f"unknown method {method!r}, expected one of {METHODS}")
+        if method != "a_star" and connectivity != 8:
+            raise ValueError("jump point search needs connectivity=8")
+        self.height, self.width = grid.shape
+        self.stride = self.width + 2
+        padded = np.zeros((self.height + 2, self.stride), dtype=np.uint8)
+        padded[1:-1, 1:-1] = np.asarray(grid) == 0
+        self.free = bytearray(padded.tobytes())
+        self.connectivity = connectivity
+        self.method = method
+        self.jump_distances = self.build_jump_distances() if method == "jps+" else None
+        self.expanded_count = 0
+
+    def index_of(self, cell: Cell) -> int:
+        row, column = cell
+        if not (0 <= row < self.height and 0 <= column < self.width):
+            raise ValueError(f"cell {cell} is outside the {self.height}x{self.width} grid")
+        return (row + 1) * self.stride + column + 1
+
+    def cell_of(self, index: int) -> Cell:
+        row, column = divmod(index, self.stride)
+        return row - 1, column - 1
+
+    def heuristic(self, index: int, goal_index: int) -> int | float:
+        row, column = divmod(index, self.stride)
+        goal_row, goal_column = divmod(goal_index, self.stride)
+        row_distance, column_distance = abs(row - goal_row), abs(column - goal_column)
+        if self.connectivity == 4:
+            return row_distance + column_distance
+        # octile distance: diagonal moves while both distances last, then straight moves
+        return max(row_distance, column_distance) + (SQRT2 - 1) * min(row_distance, column_distance)
+
+    def solve(self, start: Cell, goal: Cell) -> SearchResult:
+        """
+        The shortest path from start to goal: every cell on it, from start to goal.
+        """
+        start_index, goal_index = self.index_of(start), self.index_of(goal)
+        self.expanded_count = 0
+        if not (self.free[start_index] and self.free[goal_index]):
+            return SearchResult(SearchStatus.FAILURE)
+        successors = self.neighbours if self.method == "a_star" else self.jump_successors
+        costs = {start_index: 0}
+        parents = {start_index: -1}
+        queue = [(self.heuristic(start_index, goal_index), 0, start_index)]
+        while queue:
+            _, cost, index = heapq.heappop(queue)
+            if cost > costs[index]:
+                continue
+            if index == goal_index:
+                return SearchResult(SearchStatus.SUCCESS, cost, path_builder=partial(self.path_to, index, parents),
+                                    expanded=self.expanded_count)
+            self.expanded_count += 1
+            for child, step_cost in successors(index, parents[index], goal_index):
+                child_cost = cost + step_cost
+                if child not in costs or child_cost < costs[child]:
+                    costs[child] = child_cost
+                    parents[child] = index
+                    heapq.heappush(queue, (child_cost + self.heuristic(child, goal_index), child_cost, child))
+        return SearchResult(SearchStatus.FAILURE, expanded=self.expanded_count)
+
+    def distances_from(self, start: Cell, targets: Iterable[Cell]) -> dict[Cell, int | float]:
+        """
+        Dijkstra's algorithm from start (moving cell by cell, whatever the method) until every target
+        is settled: the cost to each target that can be reached. Cheaper than one solve() per target.
+        """
+        start_index = self.index_of(start)
+        remaining = {self.index_of(target) for target in targets}
+        distances: dict[Cell, int | float] = {}
+        if not self.free[start_index]:
+            return distances
+        costs = {start_index: 0}
+        queue = [(0, start_index)]
+        while queue and remaining:
+            cost, index = heapq.heappop(queue)
+            if cost > costs[index]:
+                continue
+            if index in remaining:
+                remaining.discard(index)
+                distances[self.cell_of(index)] = cost
+            self.expanded_count += 1
+            for child, step_cost in self.neighbours(index, -1, -1):
+                child_cost = cost + step_cost
+                if child not in costs or child_cost < costs[child]:
+                    costs[child] = child_cost
+                    heapq.heappush(queue, (child_cost, child))
+        return distances
+
+    def path_to(self, index: int, parents: dict[int, int]) -> list[Cell]:
+        # walk back through the parents, filling in the cells between jump points (always a straight or diagonal line)
+        solution_path = [self.cell_of(index)]
+        while parents[index] != -1:
+            parent = parents[index]
+            row, column = divmod(index, self.stride)
+            parent_row, parent_column = divmod(parent, self.stride)
+            step = (parent_row > row) - (parent_row < row), (parent_column > column) - (parent_column < column)
+            while index != parent:
+                index += step[0] * self.stride + step[1]
+                solution_path.append(self.cell_of(index))
+        solution_path.reverse()
+        return solution_path
+
+    def neighbours(self, index: int, parent: int, goal_index: int) -> list[tuple[int, int | float]]:
+        # every free neighbouring cell, for plain A*
+        free, stride = self.free, self.stride
+        result = []
+        for row_step, column_step in STRAIGHT_DIRECTIONS:
+            neighbour = index + row_step * stride + column_step
+            if free[neighbour]:
+                result.append((neighbour, 1))
+        if self.connectivity == 8:
+            for row_step, column_step in DIAGONAL_DIRECTIONS:
+                if free[index + row_step * stride] and free[index + column_step]:
+                    neighbour = index + row_step * stride + column_step
+                    if free[neighbour]:
+                        result.append((neighbour, SQRT2))
+        return result
+
+    def jump_successors(self, index: int, parent: int, goal_index: int) -> list[tuple[int, int | float]]:
+        # the jump points reached from index, in the directions left after pruning
+        result = []
+        for row_step, column_step in self.pruned_directions(index, parent):
+            if row_step and column_step:
+                jump_point = self.jump_diagonal(index, row_step, column_step, goal_index)
+            else:
+                jump_point = self.jump_straight(index, row_step, column_step, goal_index)
+            if jump_point is not None:
+                # a straight or diagonal line, so its cost is the octile distance
+                result.append((jump_point, self.heuristic(jump_point, index)))
+        return result
+
+    def pruned_directions(self, index: int, parent: int) -> list[Cell]:
+        """
+        The directions an optimal path arriving at index from parent could continue in: its natural
+        neighbours (straight on, and for a diagonal move the two straight parts of it) and the
+        neighbours a wall may have forced. The start (no parent) tries every direction.
+        """
+        free, stride = self.free, self.stride
+        if parent == -1:
+            directions = [direction for direction in STRAIGHT_DIRECTIONS
+                          if free[index + direction[0] * stride + direction[1]]]
+            for row_step, column_step in DIAGONAL_DIRECTIONS:
+                if free[index + row_step * stride] and free[index + column_step]:
+                    directions.append((row_step, column_step))
+            return directions
+        row, column = divmod(index, stride)
+        parent_row, parent_column = divmod(parent, stride)
+        row_step, column_step = (row > parent_row) - (row < parent_row), (column > parent_column) - (column < parent_column)
+        directions = []
+        if row_step and column_step:
+            row_free, column_free = free[index + row_step * stride], free[index + column_step]
+            if row_free:
+                directions.append((row_step, 0))
+            if column_free:
+                directions.append((0, column_step))
+            if row_free and column_free:
+                directions.append((row_step, column_step))
+        elif column_step:
+            ahead_free, up_free, down_free = free[index + column_step], free[index - stride], free[index + stride]
+            if ahead_free:
+                directions.append((0, column_step))
+                if up_free:
+                    directions.append((-1, column_step))
+                if down_free:
+                    directions.append((1, column_step))
+            if up_free:
+                directions.append((-1, 0))
+            if down_free:
+                directions.append((1, 0))
+        else:
+            ahead_free, left_free, right_free = free[index + row_step * stride], free[index - 1], free[index + 1]
+            if ahead_free:
+                directions.append((row_step, 0))
+                if left_free:
+                    directions.append((row_step, -1))
+                if right_free:
+                    directions.append((row_step, 1))
+            if left_free:
+                directions.append((0, -1))
+            if right_free:
+                directions.append((0, 1))
+        return directions
+
+    def has_forced_neighbour(self, index: int, row_step: int, column_step: int) -> bool:
+        # for a straight move into index: is a cell beside it free, where the cell beside the one before it is blocked?
+        free, stride = self.free, self.stride
+        if column_step:
+            behind = index - column_step
+            return bool((free[index - stride] and not free[behind - stride])
+                        or (free[index + stride] and not free[behind + stride]))
+        behind = index - row_step * stride
+        return bool((free[index - 1] and not free[behind - 1]) or (free[index + 1] and not free[behind + 1]))
+
+    def jump_straight(self, index: int, row_step: int, column_step: int, goal_index: int) -> int | None:
+        # the first jump point (or the goal) in a straight line from index, or None if a wall comes first
+        if self.jump_distances is not None:
+            return self.jump_straight_table(index, row_step, column_step, goal_index)
+        free = self.free
+        step = row_step * self.stride + column_step
+        while True:
+            index += step
+            if not free[index]:
+                return None
+            if index == goal_index or self.has_forced_neighbour(index, row_step, column_step):
+                return index
+
+    def jump_straight_table(self, index: int, row_step: int, column_step: int, goal_index: int) -> int | None:
+        distance = self.jump_distances[STRAIGHT_DIRECTIONS.index((row_step, column_step))][index]
+        # the goal may be on the way, before the jump point or the wall
+        row, column = divmod(index, self.stride)
+        goal_row, goal_column = divmod(goal_index, self.stride)
+        if column_step == 0 and goal_column == column:
+            goal_steps = (goal_row - row) * row_step
+        elif row_step == 0 and goal_row == row:
+            goal_steps = (goal_column - column) * column_step
+        else:
+            goal_steps = 0
+        if 0 < goal_steps <= abs(distance):
+            return goal_index
+        if distance > 0:
+            return index + distance * (row_step * self.stride + column_step)
+        return None
+
+    def jump_diagonal(self, index: int, row_step: int, column_step: int, goal_index: int) -> int | None:
+        # the first cell on a diagonal line from index from which a straight jump finds something, or None
+        free, stride = self.free, self.stride
+        step = row_step * stride + column_step
+        while True:
+            index += step
+            if not free[index]:
+                return None
+            if index == goal_index:
+                return index
+            if (self.jump_straight(index, row_step, 0, goal_index) is not None
+                    or self.jump_straight(index, 0, column_step, goal_index) is not None):
+                return index
+            # no cutting corners on the next diagonal step
+            if not (free[index + row_step * stride] and free[index + column_step]):
+                return None
+
+    def build_jump_distances(self) -> list[list[int]]:
+        """
+        The JPS+ tables. The cell after index in a direction is settled before index itself, so each
+        entry follows from the next one: a wall --> 0, a jump point --> 1, otherwise one more step than the next.
+        """
+        free = self.free
+        tables = []
+        for row_step, column_step in STRAIGHT_DIRECTIONS:
+            step = row_step * self.stride + column_step
+            table = [0] * len(free)
+            # only the interior cells need entries; the cell after them may be on the border
+            first, last = self.stride + 1, len(free) - self.stride - 2
+            indexes = range(last, first - 1, -1) if step > 0 else range(first, last + 1)
+            for index in indexes:
+                following = index + step
+                if not free[following]:
+                    table[index] = 0
+                elif self.has_forced_neighbour(following, row_step, column_step):
+                    table[index] = 1
+                else:
+                    distance = table[following]
+                    table[index] = distance + 1 if distance > 0 else distance - 1
+            tables.append(table)
+        return tables
+
+
+if __name__ == "__main__":
+    # . = free, # = blocked
+    rows = [
+        "..........",
+        "....#.....",
+        "....#..#..",
+        "....#..#..",
+        "....####..",
+        "..........",
+    ]
+    grid_1 = np.array([[character == "#" for character in row] for row in rows])
+    for connectivity_1, method_1 in ((4, "a_star"), (8, "a_star"), (8, "jps"), (8, "jps+")):
+        planner = GridPlanner(grid_1, connectivity_1, method_1)
+        result_1 = planner.solve((2, 1), (2, 8))
+        print(f"{method_1} ({connectivity_1}-connected), {planner.expanded_count} cells expanded: {result_1}")
+        if connectivity_1 == 4:
+            assert result_1.cost == 11
+        else:
+            assert abs(result_1.cost - (5 + 3 * SQRT2)) < 1e-9
+    print("done.")
@@ -0,0 +1,178 @@
+"""
+Heuristics h(x) for the sliding tile puzzles in a_star.py: admissible estimates of the number of
+moves left to reach the goal state.
+
+Each heuristic can compute h from scratch (estimate()), or derive a child's h from its parent's
+(update()). A move only ever moves one tile, by one square, into the parent's blank square, so
+update() only has to look at that tile (and, for linear conflicts, the two lines it moves between)
+instead of the whole board:
+    moved tile = the tile on the parent's blank square in the child
+    from square = child.blank_index, to square = parent.blank_index
+
+- MisplacedTiles: the number of tiles (not counting the blank) not on their goal square.
+- ManhattanDistance: the sum over tiles of the row + column distance to their goal square.
+- LinearConflict: Manhattan distance, plus 2 moves for every tile that has to step out of its
+  line (row or column) to let other tiles in the same line past it. Two tiles in their goal line
+  but in the wrong order relative to each other can't pass each other without one of them leaving
+  the line and coming back. The fewest tiles that have to leave a line is the number of tiles in
+  their goal line minus the longest run (subsequence) of them that is already in goal order.
+
+The heuristics only need the problem's geometry (width, height, tile_bits) and goal_node.
+"""
+from __future__ import annotations
+
+from bisect import bisect_left
+from typing import Protocol
+
+
+class PuzzleState(Protocol):
+    # the parts of a_star.StateNode the heuristics use
+    state_id: int
+    blank_index: int
+
+    def tiles(self) -> list[int]: ...
+
+
+class Heuristic:
+    width: int
+    height: int
+    tile_bits: int
+    tile_mask: int
+    goal_index: list[int] # goal_index[tile] = the tile's square in the goal state
+
+    def __init__(self, problem):
+        self.width = problem.width
+        self.height = problem.height
+        self.tile_bits = problem.tile_bits
+        self.tile_mask = (1 << problem.tile_bits) - 1
+        goal_tiles = problem.goal_node.tiles()
+        self.goal_index = [0] * len(goal_tiles)
+        for index, tile in enumerate(goal_tiles):
+            self.goal_index[tile] = index
+
+    def estimate(self, state: PuzzleState) -> int:
+        raise NotImplementedError
+
+    def update(self, parent_h: int, parent: PuzzleState, child: PuzzleState) -> int:
+        # the default is to recompute from scratch
+        return self.estimate(child)
+
+    def moved_tile(self, parent: PuzzleState, child: PuzzleState) -> int:
+        return (child.state_id >> (parent.blank_index * self.tile_bits)) & self.tile_mask
+
+
+class MisplacedTiles(Heuristic):
+    def estimate(self, state: PuzzleState) -> int:
+        count = 0
+        for index, tile in enumerate(state.tiles()):
+            if tile != 0 and self.goal_index[tile] != index:
+                count += 1
+        return count
+
+    def update(self, parent_h: int, parent: PuzzleState, child: PuzzleState) -> int:
+        goal = self.goal_index[self.moved_tile(parent, child)]
+        return parent_h + (goal == child.blank_index) - (goal == parent.blank_index)
+
+
+class ManhattanDistance(Heuristic):
+    distance: list[list[int]] # distance[tile][square] = moves from square to the tile's goal square
+
+    def __init__(self, problem):
+        super().__init__(problem)
+        self.distance = []
+        for tile, goal in enumerate(self.goal_index):
+            goal_row, goal_column = divmod(goal, self.width)
+            self.distance.append([
+                0 if tile == 0 else abs(row - goal_row) + abs(column - goal_column)
+                for row in range(self.height) for column in range(self.width)
+            ])
+
+    def estimate(self, state: PuzzleState) -> int:
+        return sum(self.distance[tile][index] for index, tile in enumerate(state.tiles()))
+
+    def update(self, parent_h: int, parent: PuzzleState, child: PuzzleState) -> int:
+        distance = self.distance[self.moved_tile(parent, child)]
+        return parent_h - distance[child.blank_index] + distance[parent.blank_index]
+
+
+class LinearConflict(ManhattanDistance):
+    goal_row: list[int] # goal_row[tile] = the row of the tile's goal square
+    goal_column: list[int]
+    row_squares: list[range] # the board indexes of the squares in each row
+    column_squares: list[range]
+
+    def __init__(self, problem):
+        super().__init__(problem)
+        self.goal_row = [goal // self.width for goal in self.goal_index]
+        self.goal_column = [goal % self.width for goal in self.goal_index]
+        size = self.width * self.height
+        self.row_squares = [range(row * self.width, (row + 1) * self.width) for row in range(self.height)]
+        self.column_squares = [range(column, size, self.width) for column in range(self.width)]
+
+    def estimate(self, state: PuzzleState) -> int:
+        h = super().estimate(state)
+        for row in range(self.height):
+            h += 2 * self.row_conflicts(state.state_id, row)
+        for column in range(self.width):
+            h += 2 * self.column_conflicts(state.state_id, column)
+        return h
+
+    def update(self, parent_h: int, parent: PuzzleState, child: PuzzleState) -> int:
+        h = super().update(parent_h, parent, child)
+        # only the lines the tile moves between change: a tile moving up or down stays in the
+        # same order relative to the other tiles in its column, and likewise for rows.
+        if abs(parent.blank_index - child.blank_index) == 1:
+            lines = (child.blank_index % self.width, parent.blank_index % self.width)
+            conflicts = self.column_conflicts
+        else:
+            lines = (child.blank_index // self.width, parent.blank_index // self.width)
+            conflicts = self.row_conflicts
+        for line in lines:
+            h += 2 * (conflicts(child.state_id, line) - conflicts(parent.state_id, line))
+        return h
+
+    def row_conflicts(self, state_id: int, row: int) -> int:
+        goal_columns = []
+        for index in self.row_squares[row]:
+            tile = (state_id >> (index * self.tile_bits)) & self.tile_mask
+            if tile != 0 and self.goal_row[tile] == row:
+                goal_columns.append(self.goal_column[tile])
+        return len(goal_columns) - longest_increasing_run(goal_columns)
+
+    def column_conflicts(self, state_id: int, column: int) -> int:
+        goal_rows = []
+        for index in self.column_squares[column]:
+            tile = (state_id >> (index * self.tile_bits)) & self.tile_mask
+            if tile != 0 and self.goal_column[tile] == column:
+                goal_rows.append(self.goal_row[tile])
+        return len(goal_rows) - longest_increasing_run(goal_rows)
+
+
+def longest_increasing_run(values: list[int]) -> int:
+    # the length of the longest strictly increasing subsequence (patience sorting)
+    if len(values) < 2:
+        return len(values)
+    tails: list[int] = []
+    for value in values:
+        position = bisect_left(tails, value)
+        if position == len(tails):
+            tails.append(value)
+        else:
+            tails[position] = value
+    return len(tails)
+
+
+HEURISTICS: dict[str, type[Heuristic]] = {
+    "misplaced": MisplacedTiles,
+    "manhattan": ManhattanDistance,
+    "linear_conflict": LinearConflict,
+}
+
+
+def make_heuristic(heuristic_type: str, problem) -> Heuristic:
+    """
+    Build a heuristic for the problem by name ("misplaced", "manhattan" or "linear_conflict").
+    """
+    if heuristic_type not in HEURISTICS:
+        raise ValueError(f"unknown heuristic {heuristic_type!r}, expected one of {sorted(HEURISTICS)}")
+    return HEURISTICS[heuristic_type](problem)
@@ -0,0 +1,328 @@
+"""
+Hierarchical path planning (HPA*, Botea, Müller & Schaeffer) for large occupancy grids.
+
+The grid is cut into square clusters (cluster_size x cluster_size cells). Wherever two neighbouring
+clusters share a run of free cells on both sides of their border, that run is an entrance, crossed
+at one transition (the middle of a short run) or two (the ends of a long one). Each transition is
+a pair of cells, one on each side, joined by a move costing 1.
+
+The abstract graph has one node per transition cell, with edges:
+- across each transition (cost 1), and
+- between every two transition cells of the same cluster that can reach each other inside it, with
+  the cost of the shortest path between them that stays inside the cluster (one Dijkstra search
+  per transition cell, on a GridPlanner for the cluster alone).
+A query first connects the start and goal to the transition cells of their clusters, then runs A*
+on the abstract graph (a few nodes per cluster instead of cluster_size^2 cells), and only then
+refines the abstract path, one segment at a time, into cells: each segment is either a transition
+(one step) or a path inside one cluster (grid A* on that cluster again).
+refine() is a generator, so a caller can start moving along the first segments before the rest are
+refined, or never refine the rest at all if the map changes on the way.
+
+The paths are near-optimal, not optimal: they cross cluster borders at the transitions only, and a
+shortest path inside a cluster may be longer than one leaving the cluster and coming back.
+The cost returned is the cost of the refined path.
+
+update_cells() changes cells of the grid and rebuilds only the clusters containing them: their
+borders (entrances and transitions) and intra-cluster edges, plus the intra-cluster edges of any
+neighbouring cluster whose transitions on a shared border changed.
+
+NOTE: the hierarchy here is for grids. For static graphs see contraction_hierarchies.py.
+"""
+from __future__ import annotations
+
+import heapq
+from itertools import count
+from typing import Iterable, Iterator
+
+import numpy as np
+
+from algorithms.grid_planner import SQRT2, Cell, GridPlanner
+from algorithms.search_result import SearchResult, SearchStatus
+
+# an entrance run at least this long gets a transition at each end instead of one in the middle
+LONG_ENTRANCE = 6
+
+Cluster = tuple[int, int] # (cluster row, cluster column)
+# ("vertical", i, j): the border between clusters (i, j) and (i, j + 1)
+# ("horizontal", i, j): the border between clusters (i, j) and (i + 1, j)
+Border = tuple[str, int, int]
+
+
+class HierarchicalPlanner:
+    grid: np.ndarray # the planner's own copy, True = blocked
+    cluster_size: int
+    connectivity: int
+    cluster_rows: int
+    cluster_columns: int
+    transitions: dict[Border, list[tuple[Cell, Cell]]] # the (cell, cell) pairs crossing each border
+    crossings: dict[Cell, set[Cell]] # transition cell --> the cells across its border
+    cluster_nodes: dict[Cluster, set[Cell]] # the transition cells in each cluster
+    intra_edges: dict[Cluster, dict[Cell, dict[Cell, int | float]]] # the costs between the transition cells of each cluster
+    planners: dict[Cluster, GridPlanner] # grid A* on each cluster alone
+    expanded_count: int # abstract nodes plus grid cells expanded by the last query
+    abstract_expanded_count: int # the part of expanded_count spent finding the abstract path
+    refined_expanded_count: int # the part spent refining it into cells (0 until the path is read)
+
+    def __init__(self, grid: np.ndarray, cluster_size: int = 16, connectivity: int = 8):
+        if cluster_size < 2:
+            raise ValueError("clusters must be at least 2x2 cells")
+        self.grid = np.array(grid, dtype=bool)
+        self.cluster_size = cluster_size
+        self.connectivity = connectivity
+        height, width = self.grid.shape
+        self.cluster_rows = -(-height // cluster_size)
+        self.cluster_columns = -(-width // cluster_size)
+        self.transitions = {}
+        self.crossings = {}
+        self.cluster_nodes = {}
+        self.intra_edges = {}
+        self.planners = {}
+        self.expanded_count = 0
+        self.abstract_expanded_count = 0
+        self.refined_expanded_count = 0
+        clusters = [(i, j) for i in range(self.cluster_rows) for j in range(self.cluster_columns)]
+        for cluster in clusters:
+            for border in self.borders_of(cluster):
+                if border not in self.transitions:
+                    self.build_border(border)
+        for cluster in clusters:
+            self.build_cluster(cluster)
+
+    def cluster_of(self, cell: Cell) -> Cluster:
+        return cell[0] // self.cluster_size, cell[1] // self.cluster_size
+
+    def bounds_of(self, cluster: Cluster) -> tuple[int, int, int, int]:
+        # first row, row after the last, first column, column after the last
+        size = self.cluster_size
+        return (cluster[0] * size, min((cluster[0] + 1) * size, self.grid.shape[0]),
+                cluster[1] * size, min((cluster[1] + 1) * size, self.grid.shape[1]))
+
+    def borders_of(self, cluster: Cluster) -> list[Border]:
+        i, j = cluster
+        borders = []
+        if j > 0:
+            borders.append(("vertical", i, j - 1))
+        if j < self.cluster_columns - 1:
+            borders.append(("vertical", i, j))
+        if i > 0:
+            borders.append(("horizontal", i - 1, j))
+        if i < self.cluster_rows - 1:
+            borders.append(("horizontal", i, j))
+        return borders
+
+    def build_border(self, border: Border) -> None:
+        """
+        Find the entrances on a border (the runs of cells free on both sides) and its transitions.
+        """
+        for cell, other in self.transitions.get(border, []):
+            self.crossings[cell].discard(other)
+            self.crossings[other].discard(cell)
+        orientation, i, j = border
+        if orientation == "vertical":
+            first, last, _, column = self.bounds_of((i, j))
+            # (cell on the left, cell on the right) down the border
+            pairs = [((row, column - 1), (row, column)) for row in range(first, last)]
+        else:
+            _, row, first, last = self.bounds_of((i, j))
+            pairs = [((row - 1, column), (row, column)) for column in range(first, last)]
+        transitions = []
+        run: list[tuple[Cell, Cell]] = []
+        for pair in pairs + [None]:
+            if pair is not None and not self.grid[pair[0]] and not self.grid[pair[1]]:
+                run.append(pair)
+                continue
+            if len(run) >= LONG_ENTRANCE:
+                transitions += [run[0], run[-1]]
+            elif run:
+                transitions.append(run[len(run) // 2])
+            run = []
+        self.transitions[border] = transitions
+        for cell, other in transitions:
+            self.crossings.setdefault(cell, set()).add(other)
+            self.crossings.setdefault(other, set()).add(cell)
+
+    def build_cluster(self, cluster: Cluster) -> None:
+        # the transition cells of the cluster, and the cost between each pair of them inside the cluster
+        first_row, last_row, first_column, last_column = self.bounds_of(cluster)
+        planner = GridPlanner(self.grid[first_row:last_row, first_column:last_column], self.connectivity)
+        self.planners[cluster] = planner
+        nodes = set()
+        for border in self.borders_of(cluster):
+            for pair in self.transitions[border]:
+                nodes.update(cell for cell in pair if self.cluster_of(cell) == cluster)
+        self.cluster_nodes[cluster] = nodes
+        edges: dict[Cell, dict[Cell, int | float]] = {node: {} for node in nodes}
+        ordered = sorted(nodes)
+        # the costs are symmetric, so each node only searches for the nodes after it
+        for position, node_1 in enumerate(ordered[:-1]):
+            for node_2, cost in self.cluster_distances(cluster, node_1, ordered[position + 1:]).items():
+                edges[node_1][node_2] = cost
+                edges[node_2][node_1] = cost
+        self.intra_edges[cluster] = edges
+
+    def to_local(self, cluster: Cluster, cell: Cell) -> Cell:
+        # grid coordinates --> coordinates in the cluster's own planner
+        first_row, _, first_column, _ = self.bounds_of(cluster)
+        return cell[0] - first_row, cell[1] - first_column
+
+    def cluster_search(self, cluster: Cluster, start: Cell, goal: Cell) -> SearchResult:
+        # grid A* between two cells of a cluster, without leaving it. The path is in grid coordinates
+        first_row, _, first_column, _ = self.bounds_of(cluster)
+        planner = self.planners[cluster]
+        result = planner.solve(self.to_local(cluster, start), self.to_local(cluster, goal))
+        self.expanded_count += planner.expanded_count
+        if result.success:
+            result.path = [(row + first_row, column + first_column) for row, column in result.path]
+        return result
+
+    def cluster_distances(self, cluster: Cluster, start: Cell, targets: Iterable[Cell]) -> dict[Cell, int | float]:
+        # the costs from start to each target inside the cluster, for the targets it can reach
+        first_row, _, first_column, _ = self.bounds_of(cluster)
+        planner = self.planners[cluster]
+        planner.expanded_count = 0
+        local_costs = planner.distances_from(self.to_local(cluster, start),
+                                             [self.to_local(cluster, target) for target in targets])
+        self.expanded_count += planner.expanded_count
+        return {(row + first_row, column + first_column): cost for (row, column), cost in local_costs.items()}
+
+    def update_cells(self, changes: Iterable[tuple[Cell, bool]]) -> None:
+        """
+        Set cells to blocked (True) or free (False), and rebuild the clusters they are in.
+        """
+        changed_clusters = set()
+        for cell, blocked in changes:
+            if self.grid[cell] != blocked:
+                self.grid[cell] = blocked
+                changed_clusters.add(self.cluster_of(cell))
+        borders = {border for cluster in changed_clusters for border in self.borders_of(cluster)}
+        rebuild = set(changed_clusters)
+        for border in borders:
+            old_transitions = self.transitions[border]
+            self.build_border(border)
+            if self.transitions[border] != old_transitions:
+                # the clusters on both sides have different transition cells now
+                _, i, j = border
+                rebuild.add((i, j))
+                rebuild.add((i, j + 1) if border[0] == "vertical" else (i + 1, j))
+        for cluster in rebuild:
+            self.build_cluster(cluster)
+
+    def heuristic(self, cell: Cell, goal: Cell) -> int | float:
+        row_distance, column_distance = abs(cell[0] - goal[0]), abs(cell[1] - goal[1])
+        if self.connectivity == 4:
+            return row_distance + column_distance
+        return max(row_distance, column_distance) + (SQRT2 - 1) * min(row_distance, column_distance)
+
+    def abstract_path(self, start: Cell, goal: Cell) -> tuple[list[Cell] | None, int | float | None]:
+        """
+        A* on the abstract graph, with start and goal connected to the transition cells of their clusters.
+        Returns the cells the path goes through (start, transition cells, goal) and its cost, or (None, None).
+        """
+        start_cluster, goal_cluster = self.cluster_of(start), self.cluster_of(goal)
+        start_targets = list(self.cluster_nodes[start_cluster])
+        if start_cluster == goal_cluster:
+            start_targets.append(goal)
+        start_edges = self.cluster_distances(start_cluster, start, start_targets)
+        # the costs are symmetric, so the edges into the goal come from a search from the goal
+        goal_edges = self.cluster_distances(goal_cluster, goal, self.cluster_nodes[goal_cluster])
+
+        def neighbours(cell: Cell) -> Iterator[tuple[Cell, int | float]]:
+            if cell == start:
+                yield from start_edges.items()
+            if cell != start or cell in self.crossings:
+                yield from self.intra_edges[self.cluster_of(cell)].get(cell, {}).items()
+                for other in self.crossings.get(cell, ()):
+                    yield other, 1
+            if cell in goal_edges:
+                yield goal, goal_edges[cell]
+
+        counter = count()
+        costs = {start: 0}
+        parents = {start: None}
+        queue = [(self.heuristic(start, goal), 0, next(counter), start)]
+        while queue:
+            _, cost, _, cell = heapq.heappop(queue)
+            if cost > costs[cell]:
+                continue
+            if cell == goal:
+                path = []
+                while cell is not None:
+                    path.append(cell)
+                    cell = parents[cell]
+                path.reverse()
+                return path, cost
+            self.expanded_count += 1
+            for child, step_cost in neighbours(cell):
+                child_cost = cost + step_cost
+                if child not in costs or child_cost < costs[child]:
+                    costs[child] = child_cost
+                    parents[child] = cell
+                    heapq.heappush(queue, (child_cost + self.heuristic(child, goal), child_cost, next(counter), child))
+        return None, None
+
+    def refine(self, abstract_path: list[Cell]) -> Iterator[list[Cell]]:
+        # the cells of each abstract path segment, in order, each list starting after the cell the last one ended on
+        for cell, next_cell in zip(abstract_path, abstract_path[1:]):
+            if next_cell in self.crossings.get(cell, ()):
+                yield [next_cell]
+            else:
+                yield self.cluster_search(self.cluster_of(cell), cell, next_cell).path[1:]
+
+    def solve(self, start: Cell, goal: Cell) -> SearchResult:
+        """
+        The cost comes from the abstract path. It is refined into cells when result.path is first read,
+        and result.expanded grows by the refinement's expansions then.
+        NOTE: read the path before the next update_cells(), which can change the clusters it goes through.
+        """
+        self.expanded_count = 0
+        self.abstract_expanded_count = 0
+        self.refined_expanded_count = 0
+        if self.grid[start] or self.grid[goal]:
+            return SearchResult(SearchStatus.FAILURE)
+        if start == goal:
+            return SearchResult(SearchStatus.SUCCESS, 0, [start])
+        abstract_path, cost = self.abstract_path(start, goal)
+        self.abstract_expanded_count = self.expanded_count
+        if abstract_path is None:
+            return SearchResult(SearchStatus.FAILURE, expanded=self.abstract_expanded_count)
+        result = SearchResult(SearchStatus.SUCCESS, cost, expanded=self.abstract_expanded_count)
+
+        def build_path() -> list[Cell]:
+            expanded_before = self.expanded_count
+            solution_path = [start]
+            for segment in self.refine(abstract_path):
+                solution_path += segment
+            self.refined_expanded_count = self.expanded_count - expanded_before
+            result.expanded += self.refined_expanded_count
+            return solution_path
+
+        result.path_builder = build_path
+        return result
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(1)
+    grid_1 = rng.random((64, 64)) < 0.2
+    grid_1[0, :] = grid_1[:, 0] = grid_1[-1, :] = grid_1[:, -1] = False
+    start_1, goal_1 = (0, 0), (63, 63)
+
+    flat_planner = GridPlanner(grid_1)
+    flat_result = flat_planner.solve(start_1, goal_1)
+    hierarchical_planner = HierarchicalPlanner(grid_1, cluster_size=8)
+    result_1 = hierarchical_planner.solve(start_1, goal_1)
+    abstract_expanded = result_1.expanded
+    # reading the path refines it
+    assert result_1.path[0] == start_1 and result_1.path[-1] == goal_1
+    assert result_1.expanded == abstract_expanded + hierarchical_planner.refined_expanded_count
+    print(f"grid A*: cost {flat_result.cost:.2f}, {flat_result.expanded} cells expanded")
+    print(f"HPA*: cost {result_1.cost:.2f}, {abstract_expanded} nodes and cells expanded for the abstract path, "
+          f"{hierarchical_planner.refined_expanded_count} cells to refine it")
+    assert flat_result.cost <= result_1.cost <= flat_result.cost * 1.2
+
+    # wall off the goal's corner: only its cluster is rebuilt
+    hierarchical_planner.update_cells([((row, column), True) for row in range(60, 64) for column in range(60, 64)
+                                       if min(row, column) == 60])
+    result_2 = hierarchical_planner.solve(start_1, goal_1)
+    print(result_2.status)
+    assert not result_2.success
+    print("done.")
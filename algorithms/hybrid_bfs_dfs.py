@@ -34,9 +34,34 @@ version 2 (from https://www.youtube.com/watch?v=-yF6k_bV_JQ):
         └───┘        └───┘                  └───┘
 
 (see https://monosketch.io/ for ASCII drawing tool)
+
+Parallel mode (Traverser.walk_parallel()): the "spawn walkers" loop is where the walk splits into
+independent subtrees, so those walkers can run at the same time:
+1. the top levels of the tree are expanded breadth first, in this process, until one level has
+   enough subtrees (several per worker),
+2. each subtree on that level is walked by one task on a process pool (or a thread pool, when
+   generating children waits on I/O rather than the CPU), in the same order walk() would use,
+3. the top levels and the per-subtree results are merged in walk() order, whatever order the
+   tasks finish in.
+Unbalanced trees: there are many more subtrees than workers, and each worker takes the next one
+as soon as it is done with the last, so a worker stuck on a big subtree doesn't hold the others up.
+A CompactTree (graphs/compact_tree.py) is sent to each worker process once, when it starts, and the
+tasks only send the index of their subtree's root.
+NOTE: with processes, the subtrees, children_of and visit are pickled, so they have to be picklable
+ (module level functions, not lambdas), and the results are copies.
 """
+import logging
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from os import cpu_count
+from typing import Any, Callable, Iterable
+
+from graphs.compact_tree import CompactNode, CompactTree, as_node
 from graphs.node import Node
 
+# NOTE: the traversers log instead of printing (see the note on the logger in a_star.py)
+logger = logging.getLogger(__name__)
+
 # build a graph of Nodes
 parent_node = Node(0, [])
 parent_node.children = [
@@ -77,8 +102,8 @@ parent_node_2.children = [
 class Traverser:
     start_node: Node
     history: list[Node]
-    def __init__(self, start_node: Node):
-        self.start_node = start_node
+    def __init__(self, start_node: Node | CompactNode | CompactTree):
+        self.start_node = as_node(start_node)
         self.history = []
 
     def walk(self, from_node=None):
@@ -92,15 +117,133 @@ class Traverser:
         for node in from_node.children:
             self.walk(node)
         if from_node == self.start_node:
-           print(f'Hybrid traversal complete.')
+           logger.info("Hybrid traversal complete.")
            self.print_history()
 
+    def walk_parallel(self, visit: Callable[[Any], Any] | None = None,
+                      children_of: Callable[[Any], Iterable[Any]] | None = None, workers: int | None = None,
+                      executor: str = "process", subtrees_per_worker: int = 8) -> list:
+        """
+        Walk the tree in walk() order, with the subtrees below the top levels walked in parallel.
+        Returns visit(node) for each node, in walk() order (the node ids by default).
+        children_of(node) gives a node's children (node.children by default), for trees generated on the fly.
+        """
+        if executor not in ("process", "thread"):
+            raise ValueError(f"executor must be 'process' or 'thread', not {executor!r}")
+        visit = visit if visit is not None else node_id_of
+        children_of = children_of if children_of is not None else children_of_node
+        workers = workers if workers is not None else cpu_count() or 1
+        # 1. breadth first, until a level has enough subtrees to share out
+        top_children: dict[int, list] = {}
+        level = [self.start_node]
+        frontier_depth = 0
+        while len(level) < workers * subtrees_per_worker and frontier_depth < TOP_LEVEL_LIMIT:
+            next_level = []
+            for node in level:
+                top_children[id(node)] = list(children_of(node))
+                next_level += top_children[id(node)]
+            if not next_level:
+                break
+            level = next_level
+            frontier_depth += 1
+        # the top levels in walk() order, with a SubtreeSlot where each subtree's walk goes
+        plan: list = [visit(self.start_node)]
+        roots = []
+        stack = [iter([(self.start_node, 0)])]
+        while stack:
+            item = next(stack[-1], None)
+            if item is None:
+                stack.pop()
+                continue
+            node, depth = item
+            if depth == frontier_depth:
+                plan.append(SubtreeSlot(len(roots)))
+                roots.append(node)
+                continue
+            children = top_children[id(node)]
+            plan += [visit(child) for child in children]
+            stack.append(iter([(child, depth + 1) for child in children]))
+        # 2. the walkers. map() hands out one subtree at a time and returns the results in order
+        if executor == "process" and isinstance(self.start_node, CompactNode):
+            # send each worker the tree's arrays once, and each task just the index of its subtree
+            pool = ProcessPoolExecutor(workers, initializer=init_worker_tree, initargs=(self.start_node.tree,))
+            task = partial(walk_compact_subtree, visit=visit, children_of=children_of)
+            roots = [root.index for root in roots]
+        else:
+            pool = (ProcessPoolExecutor if executor == "process" else ThreadPoolExecutor)(workers)
+            task = partial(walk_subtree, visit=visit, children_of=children_of)
+        with pool:
+            subtree_results = list(pool.map(task, roots))
+        # 3. merge
+        results = []
+        for item in plan:
+            if isinstance(item, SubtreeSlot):
+                results += subtree_results[item.index]
+            else:
+                results.append(item)
+        return results
+
     def print_history(self):
-        output: list = [x.node_id for x in self.history]
-        print(f'Path from {self.start_node.node_id}: {output}')
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Path from %s: %s", self.start_node.node_id, [x.node_id for x in self.history])
+
+
+# the most levels expanded in this process before the subtrees are handed out
+TOP_LEVEL_LIMIT = 32
+
+
+class SubtreeSlot:
+    # marks where the walk of roots[index] goes in the merged results
+    index: int
+
+    def __init__(self, index: int):
+        self.index = index
+
+
+def node_id_of(node: Node):
+    return node.node_id
+
+
+def children_of_node(node: Node) -> list[Node]:
+    return node.children
+
+
+# the CompactTree of a pool worker process, set up once by init_worker_tree()
+worker_tree: CompactTree | None = None
+
+
+def init_worker_tree(tree: CompactTree) -> None:
+    global worker_tree
+    worker_tree = tree
+
+
+def walk_compact_subtree(root_index: int, visit: Callable[[Any], Any],
+                         children_of: Callable[[Any], Iterable[Any]]) -> list:
+    return walk_subtree(CompactNode(worker_tree, root_index), visit, children_of)
+
+
+def walk_subtree(root, visit: Callable[[Any], Any], children_of: Callable[[Any], Iterable[Any]]) -> list:
+    """
+    One walker: the same order as Traverser.walk(root) without the root itself (each node's children,
+    then the walks of the children in turn), with an explicit stack instead of recursion.
+    """
+    results = []
+    stack = [iter([root])]
+    while stack:
+        node = next(stack[-1], None)
+        if node is None:
+            stack.pop()
+            continue
+        children = list(children_of(node))
+        # "process" loop
+        results += [visit(child) for child in children]
+        # "spawn walkers" loop
+        stack.append(iter(children))
+    return results
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     bfs_traverser = Traverser(parent_node)
     bfs_traverser.walk()
     traversed_ids = [x.node_id for x in bfs_traverser.history]
@@ -109,5 +252,10 @@ if __name__ == "__main__":
     bfs_traverser_2 = Traverser(parent_node_2)
     bfs_traverser_2.walk()
     traversed_ids = [x.node_id for x in bfs_traverser_2.history]
+    # the parallel walks visit the nodes in the same order as walk()
+    assert Traverser(parent_node).walk_parallel(workers=2) == [0, 7, 5, 3, 2, 4, 1, 6]
+    assert Traverser(parent_node_2).walk_parallel(workers=2) == traversed_ids
+    assert Traverser(parent_node_2).walk_parallel(workers=1, executor="thread", subtrees_per_worker=1) == traversed_ids
+    assert Traverser(CompactTree.from_node(parent_node_2)).walk_parallel(workers=2) == traversed_ids
     # NOTE: this assertion will fail. This module does not implement BFS.
     assert traversed_ids == ["A", "B", "C", "D", "E", "F", "N", "G", "H", "I", "J", "K"] # breadth first order
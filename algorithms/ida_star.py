@@ -0,0 +1,149 @@
+"""
+Iterative deepening A* (IDA*) for the sliding tile puzzles in a_star.py.
+
+IDA* runs a series of depth-first searches, each cut off at a bound on f(x) = g(x) + h(x).
+The first bound is h(start); each following bound is the smallest f that went over the last one.
+With an admissible heuristic the first solution found is optimal, like A*.
+
+Unlike a_star.Solver, nothing is kept per generated node: there is no frontier and no reached map.
+The search walks the tree with an explicit stack (no Python recursion), making and undoing moves
+in place on a single board state, so memory grows with the depth of the solution, not with the
+number of states visited. The price is that states reached by different paths are searched again,
+and every iteration repeats the work of the iterations before it (for the sliding tile puzzles,
+the last iteration dominates, so this is a small constant factor).
+The move that would undo the previous move is never made (parent-move pruning), which removes the
+most common duplicates: the sliding tile puzzles have no shorter cycles than that.
+
+Takes the same Problem and heuristics as a_star.Solver, and returns the same SearchResult.
+"""
+from __future__ import annotations
+
+from functools import partial
+
+from algorithms.a_star import OPPOSITE_MOVE, Problem, StateNode, is_solvable
+from algorithms.heuristics import Heuristic, make_heuristic
+from algorithms.search_result import SearchResult, SearchStatus
+
+
+class IDAStarSolver:
+    problem: Problem
+    heuristic: Heuristic
+    expanded_count: int # the states whose children were tried, across all iterations of the last solve()
+    generated_count: int # the children generated, across all iterations of the last solve()
+
+    def __init__(self, problem: Problem, heuristic: str | Heuristic = "linear_conflict"):
+        self.problem = problem
+        if isinstance(heuristic, str):
+            heuristic = make_heuristic(heuristic, problem)
+        self.heuristic = heuristic
+        self.expanded_count = 0
+        self.generated_count = 0
+
+    def solve(self) -> SearchResult:
+        start_node, goal_node = self.problem.start_node, self.problem.goal_node
+        self.expanded_count = 0
+        self.generated_count = 0
+        if not is_solvable(start_node, goal_node):
+            return SearchResult(SearchStatus.UNSOLVABLE)
+        bound = self.heuristic.estimate(start_node)
+        while True:
+            moves, next_bound = self.search(bound)
+            if moves is not None:
+                return SearchResult(SearchStatus.SUCCESS, len(moves), path_builder=partial(self.path_of, moves),
+                                    expanded=self.expanded_count, generated=self.generated_count)
+            if next_bound == float('inf'):
+                return SearchResult(SearchStatus.FAILURE, expanded=self.expanded_count,
+                                    generated=self.generated_count)
+            bound = next_bound
+
+    def search(self, bound: int) -> tuple[list[int] | None, int | float]:
+        """
+        One depth-first search with f(x) <= bound.
+        Returns the moves from the start to the goal if the goal was found, and the smallest f over the bound.
+        """
+        problem, heuristic = self.problem, self.heuristic
+        board = problem.board
+        tile_bits, tile_mask, move_table = board.tile_bits, board.tile_mask, board.moves
+        goal_id = problem.goal_node.state_id
+        # the one board state the search moves around, and a scratch state for the child being considered
+        state = StateNode(problem.start_node.state_id, problem.start_node.blank_index, board)
+        child = StateNode(0, 0, board)
+        if state.state_id == goal_id:
+            return [], bound
+        next_bound = float('inf')
+        # one entry per depth: the h of the state at that depth, and the next option in its move table to try
+        h_stack = [heuristic.estimate(state)]
+        option_stack = [0]
+        self.expanded_count += 1
+        # the moves made to reach the current depth, and the blank's square before each of them
+        moves: list[int] = []
+        blanks: list[int] = []
+        while h_stack:
+            options = move_table[state.blank_index]
+            option = option_stack[-1]
+            undo_move = OPPOSITE_MOVE[moves[-1]] if moves else None
+            if option < len(options) and options[option][0] == undo_move:
+                option += 1
+            if option == len(options):
+                # every child tried: backtrack, moving the blank back to where it was
+                h_stack.pop()
+                option_stack.pop()
+                if not moves:
+                    break
+                moves.pop()
+                swap_index = blanks.pop()
+                shift = swap_index * tile_bits
+                tile = (state.state_id >> shift) & tile_mask
+                state.state_id += (tile << (state.blank_index * tile_bits)) - (tile << shift)
+                state.blank_index = swap_index
+                continue
+            option_stack[-1] = option + 1
+            move, swap_index = options[option]
+            shift = swap_index * tile_bits
+            tile = (state.state_id >> shift) & tile_mask
+            child.state_id = state.state_id + (tile << (state.blank_index * tile_bits)) - (tile << shift)
+            child.blank_index = swap_index
+            child_h = heuristic.update(h_stack[-1], state, child)
+            self.generated_count += 1
+            f = len(moves) + 1 + child_h
+            if f > bound:
+                if f < next_bound:
+                    next_bound = f
+                continue
+            # make the move in place
+            moves.append(move)
+            blanks.append(state.blank_index)
+            state.state_id = child.state_id
+            state.blank_index = swap_index
+            if state.state_id == goal_id:
+                return moves, bound
+            h_stack.append(child_h)
+            option_stack.append(0)
+            self.expanded_count += 1
+        return None, next_bound
+
+    def path_of(self, moves: list[int]) -> list[str]:
+        # replay the moves from the start to list the states on the path
+        problem = self.problem
+        state = problem.start_node
+        solution_path = [str(state)]
+        for move in moves:
+            swap_index = next(swap for option, swap in problem.moves[state.blank_index] if option == move)
+            state = problem.apply(state, swap_index)
+            solution_path.append(str(state))
+        return solution_path
+
+
+if __name__ == "__main__":
+    start_node_1 = StateNode.from_tiles("283164705")
+    goal_node_1 = StateNode.from_tiles("123804765")
+    result_1 = IDAStarSolver(Problem(start_node_1, goal_node_1)).solve()
+    print(result_1)
+    assert result_1.cost == 5
+
+    start_node_2 = StateNode.from_tiles("2 3 0 10 6 7 11 8 1 14 4 12 5 13 9 15")
+    goal_node_2 = StateNode.from_tiles("1 2 3 4 5 6 7 8 9 10 11 12 13 14 15 0")
+    result_2 = IDAStarSolver(Problem(start_node_2, goal_node_2)).solve()
+    print(f"15-puzzle cost: {result_2.cost}")
+    assert result_2.cost == 32
+    print("done.")
@@ -0,0 +1,202 @@
+"""
+Incremental replanning with D* Lite (Koenig & Likhachev), for graphs whose edge weights keep changing.
+
+dijkstra.Traverser searches from scratch every time. When one road is closed, most of the last
+search is still right: only the nodes whose shortest distance ran through the changed edges need
+fixing. D* Lite keeps two values per node between calls:
+- g(s):   the distance from s to the goal found by the last search.
+- rhs(s): the one-step lookahead, min over the successors s' of s of cost(s, s') + g(s'), which
+          is always up to date with the current edge weights (rhs(goal) = 0).
+A node is consistent when g(s) = rhs(s). An edge change only updates the rhs of the node it leaves,
+making that node inconsistent, and replan() only expands inconsistent nodes (in order of their
+key, like Dijkstra/A*), until the start is consistent and nothing in the queue could still lower
+its distance. So the work done scales with the part of the graph the change affects.
+
+The search runs backwards, from the goal towards the start, so g(s) is a distance *to* the goal and
+the start can move along the path (move_start()) without losing any of it: the heuristic is measured
+from the start, and km adds up how far the start has moved so the old keys stay lower bounds.
+With a fixed start this is LPA* (Lifelong Planning A*) run backwards.
+
+The queue is a binary heap with lazy deletion, like dijkstra.Frontier: entries maps each queued
+node to its current key, and heap entries whose key doesn't match are skipped when popped.
+
+NOTE: the planner changes the graph it is given (update_edges() writes the new weights into it).
+ Pass it a copy to keep the original.
+"""
+from __future__ import annotations
+
+import heapq
+from itertools import count
+from typing import Callable, Hashable, Iterable
+
+from networkx.classes import Graph
+
+from algorithms.search_result import SearchResult, SearchStatus
+
+INFINITY = float('inf')
+
+
+class IncrementalPlanner:
+    graph: Graph
+    start: Hashable
+    goal: Hashable
+    heuristic: Callable[[Hashable, Hashable], int | float] # a lower bound on the distance between two nodes
+    weight: str
+    g: dict[Hashable, int | float] # missing nodes have g = inf
+    rhs: dict[Hashable, int | float] # missing nodes have rhs = inf
+    km: int | float # the heuristic distance the start has moved, added to every new key
+    queue: list[tuple[tuple[int | float, int | float], int, Hashable]]
+    entries: dict[Hashable, tuple[int | float, int | float]] # the queued nodes and their current keys
+    counter: count # breaks ties between equal keys, in insertion order
+    expanded_count: int # nodes expanded, over every call to replan()
+
+    def __init__(self, graph: Graph, start: Hashable, goal: Hashable,
+                 heuristic: Callable[[Hashable, Hashable], int | float] | None = None, weight: str = "weight"):
+        for node in (start, goal):
+            if node not in graph:
+                raise ValueError(f"node {node!r} is not in the graph")
+        self.graph = graph
+        self.start = start
+        self.goal = goal
+        self.heuristic = heuristic if heuristic is not None else (lambda node_1, node_2: 0)
+        self.weight = weight
+        self.g = {}
+        self.rhs = {goal: 0}
+        self.km = 0
+        self.queue = []
+        self.entries = {}
+        self.counter = count()
+        self.expanded_count = 0
+        self.push(goal)
+
+    def key(self, node: Hashable) -> tuple[int | float, int | float]:
+        g_rhs = min(self.g.get(node, INFINITY), self.rhs.get(node, INFINITY))
+        return g_rhs + self.heuristic(self.start, node) + self.km, g_rhs
+
+    def push(self, node: Hashable) -> None:
+        key = self.key(node)
+        self.entries[node] = key
+        heapq.heappush(self.queue, (key, next(self.counter), node))
+
+    def top(self) -> tuple[tuple[int | float, int | float], Hashable | None]:
+        # the smallest live key in the queue and its node, after discarding stale entries
+        while self.queue:
+            key, _, node = self.queue[0]
+            if self.entries.get(node) == key:
+                return key, node
+            heapq.heappop(self.queue)
+        return (INFINITY, INFINITY), None
+
+    def successors(self, node: Hashable) -> Iterable[tuple[Hashable, int | float]]:
+        for successor, data in self.graph.adj[node].items():
+            yield successor, data.get(self.weight, 1)
+
+    def predecessors(self, node: Hashable) -> Iterable[Hashable]:
+        return self.graph.pred[node] if self.graph.is_directed() else self.graph.adj[node]
+
+    def update_node(self, node: Hashable) -> None:
+        # recompute rhs from the successors, and (re)queue the node if it is inconsistent
+        if node != self.goal:
+            g = self.g
+            self.rhs[node] = min((cost + g.get(successor, INFINITY) for successor, cost in self.successors(node)),
+                                 default=INFINITY)
+        self.entries.pop(node, None)
+        if self.g.get(node, INFINITY) != self.rhs.get(node, INFINITY):
+            self.push(node)
+
+    def compute_shortest_path(self) -> None:
+        g, rhs = self.g, self.rhs
+        while True:
+            top_key, node = self.top()
+            if node is None or (top_key >= self.key(self.start)
+                                and rhs.get(self.start, INFINITY) == g.get(self.start, INFINITY)):
+                break
+            new_key = self.key(node)
+            if top_key < new_key:
+                # the key went stale as the start moved: requeue it with the right one
+                self.push(node)
+                continue
+            self.entries.pop(node)
+            self.expanded_count += 1
+            if g.get(node, INFINITY) > rhs[node]:
+                # overconsistent: the node got closer to the goal
+                g[node] = rhs[node]
+            else:
+                # underconsistent: the node got further away. Reset it, and let it find its new distance
+                g[node] = INFINITY
+                self.update_node(node)
+            for predecessor in list(self.predecessors(node)):
+                self.update_node(predecessor)
+
+    def replan(self) -> SearchResult:
+        """
+        Bring the search up to date with the edge changes so far, and return the shortest path from start to goal.
+        result.expanded counts the nodes expanded by this call only.
+        NOTE: the path is followed down the g values when it is first read, so read it before the next
+         update_edges() or move_start().
+        """
+        expanded_before = self.expanded_count
+        self.compute_shortest_path()
+        expanded = self.expanded_count - expanded_before
+        if self.g.get(self.start, INFINITY) == INFINITY:
+            return SearchResult(SearchStatus.FAILURE, expanded=expanded)
+        return SearchResult(SearchStatus.SUCCESS, self.g[self.start], path_builder=self.path, expanded=expanded)
+
+    def path(self) -> list[Hashable]:
+        # follow the best successor (by cost + g) from the start down to the goal
+        g = self.g
+        node = self.start
+        solution_path = [node]
+        while node != self.goal:
+            node = min(self.successors(node), key=lambda item: item[1] + g.get(item[0], INFINITY))[0]
+            solution_path.append(node)
+        return solution_path
+
+    def update_edges(self, changes: Iterable[tuple[Hashable, Hashable, int | float | None]]) -> None:
+        """
+        Apply a batch of edge changes (u, v, new weight) to the graph. A new weight of None removes
+        the edge (a closure); an edge that doesn't exist yet is added. Nothing is searched until replan().
+        """
+        changed = set()
+        for u, v, weight in changes:
+            if weight is None:
+                if self.graph.has_edge(u, v):
+                    self.graph.remove_edge(u, v)
+            else:
+                self.graph.add_edge(u, v, **{self.weight: weight})
+            # the edge leaves u (and v too, if the graph is undirected)
+            changed.add(u)
+            if not self.graph.is_directed():
+                changed.add(v)
+        for node in changed:
+            self.update_node(node)
+
+    def move_start(self, start: Hashable) -> None:
+        # e.g. after following the path for a few steps. The goal stays where it is
+        self.km += self.heuristic(self.start, start)
+        self.start = start
+
+
+if __name__ == "__main__":
+    import networkx as nx
+
+    from algorithms.dijkstra import G
+
+    graph_1 = G.copy()
+    planner = IncrementalPlanner(graph_1, "A", "C")
+    result_1 = planner.replan()
+    print(result_1)
+    assert result_1.cost == 12
+
+    # congestion on D --> F and a closure on E --> C
+    planner.update_edges([("D", "F", 10), ("E", "C", None)])
+    result_2 = planner.replan()
+    print(result_2)
+    assert result_2.cost == nx.dijkstra_path_length(graph_1, "A", "C")
+
+    planner.move_start("B")
+    result_3 = planner.replan()
+    print(result_3)
+    assert result_3.cost == nx.dijkstra_path_length(graph_1, "B", "C")
+    print(f"expanded {planner.expanded_count} nodes in total")
+    print("done.")
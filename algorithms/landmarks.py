@@ -0,0 +1,258 @@
+"""
+ALT: A* search with Landmarks and the Triangle inequality, for many point-to-point queries on one graph.
+
+Preprocessing picks a few landmark nodes L and stores the shortest path distance from (and, for
+directed graphs, to) every landmark for every node. For any nodes v and t, the triangle inequality
+gives lower bounds on the distance from v to t:
+    d(v, t) >= d(L, t) - d(L, v)    (L --> v --> t is no shorter than L --> t)
+    d(v, t) >= d(v, L) - d(t, L)    (v --> t --> L is no shorter than v --> L)
+and on an undirected graph d(L, v) = d(v, L), so together: d(v, t) >= |d(L, t) - d(L, v)|.
+The largest bound over the landmarks is an admissible, consistent heuristic for A*, which steers
+the search towards the goal instead of growing a circle around the start like Dijkstra's algorithm.
+It is strongest for goals "behind" a landmark, so good landmarks sit far apart on the graph's edges.
+
+Landmark selection (Landmarks.select()):
+- "farthest": each new landmark is the node furthest from the landmarks chosen so far.
+- "avoid": grows a shortest path tree from a random root, weights each node by how badly the
+  current landmarks bound its distance from the root, and walks down to a leaf of the heaviest
+  subtree without a landmark (Goldberg & Harrelson). Better query speed, slower to select.
+
+The distances are NumPy arrays with one row per node and one column per landmark, and can be
+saved and loaded with save() and load() so the preprocessing runs once per graph.
+"""
+from __future__ import annotations
+
+import heapq
+from pathlib import Path
+from typing import Hashable
+
+import numpy as np
+from networkx.classes import Graph
+
+from algorithms.distance_matrix import DijkstraWorkspace
+from algorithms.search_result import SearchResult, SearchStatus
+from graphs.csr import CSRGraph
+
+
+class Landmarks:
+    landmark_indices: np.ndarray # the node index of each landmark
+    from_landmarks: np.ndarray # from_landmarks[v, k] = d(landmark k, v), inf where unreachable
+    to_landmarks: np.ndarray # to_landmarks[v, k] = d(v, landmark k). The same array as from_landmarks if undirected
+    directed: bool
+
+    def __init__(self, landmark_indices: np.ndarray, from_landmarks: np.ndarray, to_landmarks: np.ndarray | None = None):
+        self.landmark_indices = landmark_indices
+        self.from_landmarks = from_landmarks
+        self.directed = to_landmarks is not None
+        self.to_landmarks = to_landmarks if to_landmarks is not None else from_landmarks
+
+    @property
+    def count(self) -> int:
+        return len(self.landmark_indices)
+
+    @classmethod
+    def select(cls, graph: CSRGraph, count: int, method: str = "farthest",
+               reverse_graph: CSRGraph | None = None, seed: int = 0) -> Landmarks:
+        """
+        Pick count landmarks and compute their distances. Pass reverse_graph (a CSRGraph of the
+        reversed graph) for a directed graph, to also get the distances to the landmarks.
+        """
+        if method not in ("farthest", "avoid"):
+            raise ValueError(f"unknown landmark selection method {method!r}, expected 'farthest' or 'avoid'")
+        count = min(count, graph.node_count)
+        rng = np.random.default_rng(seed)
+        chosen: list[int] = []
+        from_columns: list[np.ndarray] = []
+        to_columns: list[np.ndarray] = []
+        # one workspace per graph, so the searches share their scratch buffers
+        workspace = DijkstraWorkspace(graph)
+        reverse_workspace = DijkstraWorkspace(reverse_graph) if reverse_graph is not None else None
+        # farthest: the distance from each node to the nearest landmark so far, starting from a random node
+        nearest = workspace.shortest_path_tree(int(rng.integers(graph.node_count)))[0]
+        while len(chosen) < count:
+            if method == "farthest":
+                candidate = farthest_node(nearest, chosen)
+            else:
+                partial = cls(np.array(chosen, dtype=np.int64), column_stack(from_columns, graph.node_count),
+                              column_stack(to_columns, graph.node_count) if reverse_graph is not None else None)
+                candidate = avoid_node(workspace, partial, rng)
+            distances = workspace.shortest_path_tree(candidate)[0]
+            chosen.append(candidate)
+            from_columns.append(distances)
+            if reverse_workspace is not None:
+                to_columns.append(reverse_workspace.shortest_path_tree(candidate)[0])
+            nearest = distances if len(chosen) == 1 else np.minimum(nearest, distances)
+        return cls(np.array(chosen, dtype=np.int64), column_stack(from_columns, graph.node_count),
+                   column_stack(to_columns, graph.node_count) if reverse_graph is not None else None)
+
+    def save(self, path: str | Path) -> None:
+        arrays = {"landmark_indices": self.landmark_indices, "from_landmarks": self.from_landmarks}
+        if self.directed:
+            arrays["to_landmarks"] = self.to_landmarks
+        np.savez(path, **arrays)
+
+    @classmethod
+    def load(cls, path: str | Path) -> Landmarks:
+        with np.load(path) as arrays:
+            return cls(arrays["landmark_indices"], arrays["from_landmarks"],
+                       arrays["to_landmarks"] if "to_landmarks" in arrays else None)
+
+    def lower_bound(self, from_index: int, to_index: int) -> float:
+        # the best triangle inequality lower bound on d(from, to), for one pair (see lower_bounds_to())
+        return self.lower_bounds_to(to_index)(from_index)
+
+    def lower_bounds_to(self, to_index: int):
+        """
+        A function giving the lower bound on d(v, to) for any node index v.
+        Infinite distances need care: inf - inf is nan, and tells us nothing, so those landmarks are skipped.
+        """
+        from_target = self.from_landmarks[to_index].tolist()
+        to_target = self.to_landmarks[to_index].tolist()
+        from_landmarks, to_landmarks = self.from_landmarks, self.to_landmarks
+
+        def lower_bound(index: int) -> float:
+            best = 0.0
+            for landmark_to_target, landmark_to_node, node_to_landmark, target_to_landmark in zip(
+                    from_target, from_landmarks[index].tolist(), to_landmarks[index].tolist(), to_target):
+                if landmark_to_target != landmark_to_node:
+                    best = max(best, landmark_to_target - landmark_to_node)
+                if node_to_landmark != target_to_landmark:
+                    best = max(best, node_to_landmark - target_to_landmark)
+            return best
+        return lower_bound
+
+    def lower_bounds_from(self, from_index: int) -> np.ndarray:
+        # the lower bounds on d(from, v) for every node v at once
+        with np.errstate(invalid="ignore"):
+            # fmax skips the nan terms (inf - inf); a node with only nan terms gets no bound (0)
+            bounds = np.fmax(self.from_landmarks - self.from_landmarks[from_index],
+                             self.to_landmarks[from_index] - self.to_landmarks)
+            best = np.fmax.reduce(bounds, axis=1, initial=0.0)
+        return np.nan_to_num(best, nan=0.0, neginf=0.0, posinf=np.inf)
+
+
+def column_stack(columns: list[np.ndarray], node_count: int) -> np.ndarray:
+    if not columns:
+        return np.empty((node_count, 0), dtype=np.float64)
+    return np.column_stack(columns)
+
+
+def farthest_node(nearest: np.ndarray, chosen: list[int]) -> int:
+    # the node furthest from every landmark so far. Unreachable (inf) nodes come first,
+    # so each connected component of the graph gets a landmark before any gets a second one.
+    candidates = nearest.copy()
+    candidates[chosen] = -1
+    return int(np.argmax(candidates))
+
+
+def avoid_node(workspace: DijkstraWorkspace, landmarks: Landmarks, rng: np.random.Generator) -> int:
+    """
+    The "avoid" rule: the leaf reached by walking down the heaviest landmark-free subtree of a
+    shortest path tree from a random root, where a node's weight is its distance from the root minus
+    the current lower bound on that distance (how much the current landmarks underestimate it).
+    """
+    graph = workspace.graph
+    root = int(rng.integers(graph.node_count))
+    distances, parents = workspace.shortest_path_tree(root)
+    distances = distances.tolist()
+    children: list[list[int]] = [[] for _ in range(graph.node_count)]
+    for node, parent in enumerate(parents.tolist()):
+        if parent != -1:
+            children[parent].append(node)
+    # the tree in breadth-first order, so every child comes after its parent
+    order = [root]
+    for node in order:
+        order.extend(children[node])
+    lower_bounds = landmarks.lower_bounds_from(root).tolist()
+    has_landmark = [False] * graph.node_count
+    for landmark in landmarks.landmark_indices.tolist():
+        has_landmark[landmark] = True
+    size = [0.0] * graph.node_count
+    for node in reversed(order):
+        for child in children[node]:
+            has_landmark[node] = has_landmark[node] or has_landmark[child]
+        if not has_landmark[node]:
+            weight = distances[node] - lower_bounds[node]
+            size[node] = weight + sum(size[child] for child in children[node])
+    node = max(order, key=size.__getitem__)
+    if size[node] <= 0:
+        # every node on the tree is already bounded exactly: any node not yet chosen will do
+        free = np.setdiff1d(np.arange(graph.node_count), landmarks.landmark_indices)
+        return int(rng.choice(free))
+    while children[node]:
+        node = max(children[node], key=size.__getitem__)
+    return node
+
+
+class ALTTraverser:
+    """
+    A* on a CSRGraph, with the landmark lower bounds as the heuristic.
+    Build the CSRGraph and the Landmarks once, then run as many queries as needed.
+    """
+    graph: CSRGraph
+    landmarks: Landmarks
+    start_index: int
+    goal_index: int
+    settled_count: int
+
+    def __init__(self, graph: Graph | CSRGraph, landmarks: Landmarks, start_node_id: Hashable, goal_node_id: Hashable):
+        if not isinstance(graph, CSRGraph):
+            graph = CSRGraph.from_networkx(graph)
+        if landmarks.from_landmarks.shape[0] != graph.node_count:
+            raise ValueError("the landmarks were computed for a different graph")
+        self.graph = graph
+        self.landmarks = landmarks
+        self.start_index = graph.index_of[start_node_id]
+        self.goal_index = graph.index_of[goal_node_id]
+        self.settled_count = 0
+
+    def solve(self) -> SearchResult:
+        indptr, indices, weights = self.graph.indptr, self.graph.indices, self.graph.weights
+        lower_bound = self.landmarks.lower_bounds_to(self.goal_index)
+        # h is computed at most once per reached node
+        heuristic_costs: dict[int, float] = {}
+        distances: dict[int, int | float] = {self.start_index: 0}
+        parents: dict[int, int] = {self.start_index: -1}
+        queue = [(lower_bound(self.start_index), 0, self.start_index)]
+        self.settled_count = 0
+        while queue:
+            _, distance, index = heapq.heappop(queue)
+            if distance > distances[index]:
+                continue
+            self.settled_count += 1
+            if index == self.goal_index:
+                return SearchResult(SearchStatus.SUCCESS, distance, path_builder=lambda: self.path_to(index, parents),
+                                    expanded=self.settled_count)
+            start, end = indptr[index], indptr[index + 1]
+            for child, weight in zip(indices[start:end].tolist(), weights[start:end].tolist()):
+                child_distance = distance + weight
+                if child not in distances or child_distance < distances[child]:
+                    if child not in heuristic_costs:
+                        heuristic_costs[child] = lower_bound(child)
+                    if heuristic_costs[child] == float('inf'):
+                        # the landmarks show the goal can't be reached from the child
+                        continue
+                    distances[child] = child_distance
+                    parents[child] = index
+                    heapq.heappush(queue, (child_distance + heuristic_costs[child], child_distance, child))
+        return SearchResult(SearchStatus.FAILURE, expanded=self.settled_count)
+
+    def path_to(self, index: int, parents: dict[int, int]) -> list[Hashable]:
+        solution_path: list[Hashable] = []
+        while index != -1:
+            solution_path.append(self.graph.node_ids[index])
+            index = parents[index]
+        solution_path.reverse()
+        return solution_path
+
+
+if __name__ == "__main__":
+    from algorithms.dijkstra import G
+
+    csr_graph = CSRGraph.from_networkx(G)
+    landmarks_1 = Landmarks.select(csr_graph, 2)
+    print(f"landmarks: {[csr_graph.node_ids[index] for index in landmarks_1.landmark_indices]}")
+    result_1 = ALTTraverser(csr_graph, landmarks_1, "A", "C").solve()
+    print(result_1)
+    assert result_1.cost == 12
+    print("done.")
@@ -0,0 +1,265 @@
+"""
+Additive pattern databases (PDBs) for the sliding tile puzzles in a_star.py.
+
+A pattern database for a group of tiles (the pattern) stores, for every placement of those tiles
+on the board, the fewest moves *of those tiles* needed to bring them to their goal squares, with
+all other tiles treated as interchangeable blanks-that-can't-move-on-their-own. If the board's tiles
+are split into disjoint patterns (e.g. 1-6, 7-12 and 13-15 for the 15-puzzle), every move moves
+a tile from exactly one pattern, so the values from the databases can be added and the sum is
+still an admissible heuristic, usually far stronger than Manhattan distance.
+
+Building (build_pattern_database()): a breadth-first search backwards from the goal over the
+abstract states (pattern tile squares + blank square). Moving the blank onto a pattern tile costs
+1, moving it onto any other tile costs 0, so this is a 0-1 BFS (deque, 0-cost moves to the front).
+The stored value for a placement is the minimum over all blank squares.
+NOTE: the build is the expensive step (pure Python, one pass over every abstract state: about
+ 5.8 million placements x 16 blank squares for a 6-tile 15-puzzle pattern), so build once and
+ save() the result. The build holds a byte per abstract state, so only 6-6-3-style partitions are
+ practical for the 15-puzzle: a 7-tile pattern needs about 920 MB, an 8-tile one about 8.3 GB.
+ A pattern can't hold every tile (that is just the puzzle itself, and half of its placements are
+ unreachable by parity). Big patterns can have other unreachable placements too (e.g. 7 tiles
+ of the 8-puzzle, with the two free squares apart): they never turn up in a solvable state, and
+ are stored as 0.
+
+Storage: one entry per placement, indexed by the rank of the pattern tiles' squares (a perfect
+hash onto 0 .. size! / (size - k)! - 1, see rank_squares()), 1 byte per entry, or 4 bits per entry
+if every value fits. save() writes a small header and the raw entries; load() memory-maps the
+file read-only, so several solver processes using the same database share one copy of it in
+the OS page cache.
+
+Usage:
+    databases = [build_pattern_database(goal_node, pattern) for pattern in partition]
+    solver = Solver(problem, PatternDatabaseHeuristic(problem, databases))
+or from the command line, to build and save a partition for the standard 15-puzzle goal:
+    python -m algorithms.pattern_database --width 4 --out pdbs 1,2,3,4,5,6 7,8,9,10,11,12 13,14,15
+"""
+from __future__ import annotations
+
+import mmap
+import struct
+from collections import deque
+from math import perm
+from pathlib import Path
+from typing import Sequence
+
+from algorithms.a_star import Board, StateNode
+from algorithms.heuristics import Heuristic, PuzzleState
+
+PDB_MAGIC = b"PDB1"
+# width, height, bits per entry, number of pattern tiles
+PDB_HEADER = struct.Struct("<4sBBBB")
+UNVISITED = 0xFF
+
+
+def rank_squares(squares: Sequence[int], size: int) -> int:
+    """
+    A perfect hash of k distinct squares (in pattern tile order) onto 0 .. size! / (size - k)! - 1.
+    The i-th square is written as a digit in base (size - i): its index among the squares not
+    taken by the squares before it.
+    e.g. size 9, squares (4, 0, 8) --> digits (4, 0, 6) --> (4 * 8 + 0) * 7 + 6 = 230
+    """
+    rank = 0
+    for i, square in enumerate(squares):
+        digit = square
+        for earlier in squares[:i]:
+            if earlier < square:
+                digit -= 1
+        rank = rank * (size - i) + digit
+    return rank
+
+
+def unrank_squares(rank: int, count: int, size: int) -> list[int]:
+    # the inverse of rank_squares()
+    digits = [0] * count
+    for i in range(count - 1, -1, -1):
+        rank, digits[i] = divmod(rank, size - i)
+    free = list(range(size))
+    return [free.pop(digit) for digit in digits]
+
+
+class PatternDatabase:
+    board: Board
+    pattern: tuple[int, ...] # the pattern tiles, in the order their squares are ranked
+    goal_tiles: tuple[int, ...] # the goal board the database was built for
+    bits: int # 8 or 4 bits per entry
+    entries: bytes | bytearray | memoryview
+    mapped_file: mmap.mmap | None # set when the entries are memory-mapped from a file
+
+    def __init__(self, board: Board, pattern: Sequence[int], goal_tiles: Sequence[int], bits: int,
+                 entries: bytes | bytearray | memoryview, mapped_file: mmap.mmap | None = None):
+        if bits not in (4, 8):
+            raise ValueError("a pattern database stores 4 or 8 bits per entry")
+        self.board = board
+        self.pattern = tuple(pattern)
+        self.goal_tiles = tuple(goal_tiles)
+        self.bits = bits
+        self.entries = entries
+        self.mapped_file = mapped_file
+
+    @property
+    def entry_count(self) -> int:
+        return perm(self.board.size, len(self.pattern))
+
+    def value(self, rank: int) -> int:
+        if self.bits == 8:
+            return self.entries[rank]
+        return (self.entries[rank >> 1] >> ((rank & 1) << 2)) & 0xF
+
+    def lookup(self, state_id: int) -> int:
+        # the moves of pattern tiles needed to solve the packed board
+        tile_bits, tile_mask = self.board.tile_bits, self.board.tile_mask
+        square_of = [0] * self.board.size
+        for index in range(self.board.size):
+            square_of[(state_id >> (index * tile_bits)) & tile_mask] = index
+        return self.value(rank_squares([square_of[tile] for tile in self.pattern], self.board.size))
+
+    def save(self, path: str | Path) -> None:
+        with open(path, "wb") as file:
+            file.write(PDB_HEADER.pack(PDB_MAGIC, self.board.width, self.board.height, self.bits, len(self.pattern)))
+            file.write(bytes(self.pattern))
+            file.write(bytes(self.goal_tiles))
+            file.write(self.entries)
+
+    @classmethod
+    def load(cls, path: str | Path) -> PatternDatabase:
+        """
+        Memory-map a saved database. The entries are read from the page cache on demand,
+        and stay shared between all the processes that map the same file.
+        """
+        with open(path, "rb") as file:
+            mapped_file = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, width, height, bits, count = PDB_HEADER.unpack_from(mapped_file)
+        if magic != PDB_MAGIC:
+            raise ValueError(f"{path} is not a pattern database file")
+        board = Board.of(width, height)
+        offset = PDB_HEADER.size
+        pattern = mapped_file[offset:offset + count]
+        offset += count
+        goal_tiles = mapped_file[offset:offset + board.size]
+        offset += board.size
+        database = cls(board, pattern, goal_tiles, bits, memoryview(mapped_file)[offset:], mapped_file)
+        expected = database.entry_count if bits == 8 else (database.entry_count + 1) // 2
+        if len(database.entries) != expected:
+            raise ValueError(f"{path} has {len(database.entries)} bytes of entries, expected {expected}")
+        return database
+
+
+def build_pattern_database(goal_node: StateNode, pattern: Sequence[int], bits: int = 8) -> PatternDatabase:
+    """
+    0-1 BFS backwards from the goal over (pattern tile squares, blank square), see the module docstring.
+    bits=4 halves the size, and raises ValueError if any value doesn't fit in 4 bits.
+    """
+    board = goal_node.board
+    size = board.size
+    if 0 in pattern or len(set(pattern)) != len(pattern) or not all(0 < tile < size for tile in pattern):
+        raise ValueError(f"a pattern is a set of distinct tiles from 1 to {size - 1}")
+    if len(pattern) == size - 1:
+        raise ValueError("a pattern can't hold every tile: leave at least one tile out (see the module docstring)")
+    count = len(pattern)
+    goal_tiles = goal_node.tiles()
+    goal_squares = [goal_tiles.index(tile) for tile in pattern]
+    placements = perm(size, count)
+    # distance for each (placement rank, blank square)
+    distances = bytearray([UNVISITED]) * (placements * size)
+    start = rank_squares(goal_squares, size) * size + goal_node.blank_index
+    distances[start] = 0
+    queue = deque([start])
+    while queue:
+        state = queue.popleft()
+        distance = distances[state]
+        rank, blank = divmod(state, size)
+        squares = unrank_squares(rank, count, size)
+        for _, swap_index in board.moves[blank]:
+            if swap_index in squares:
+                # the blank swaps with a pattern tile: one move
+                moved = squares.copy()
+                moved[squares.index(swap_index)] = blank
+                child = rank_squares(moved, size) * size + swap_index
+                if distances[child] == UNVISITED or distances[child] > distance + 1:
+                    distances[child] = distance + 1
+                    queue.append(child)
+            else:
+                # the blank swaps with a tile outside the pattern: free
+                child = rank * size + swap_index
+                if distances[child] == UNVISITED or distances[child] > distance:
+                    distances[child] = distance
+                    queue.appendleft(child)
+    # each placement's value is the minimum over the blank squares (UNVISITED is larger than any distance),
+    # and 0 for the placements the search never reached
+    if bits == 8:
+        entries = bytearray(placements)
+        for rank in range(placements):
+            value = min(distances[rank * size:(rank + 1) * size])
+            entries[rank] = value if value != UNVISITED else 0
+    elif bits == 4:
+        entries = bytearray((placements + 1) // 2)
+        for rank in range(placements):
+            value = min(distances[rank * size:(rank + 1) * size])
+            if value == UNVISITED:
+                continue
+            if value > 0xF:
+                raise ValueError(f"the value of placement {rank}, {value}, needs more than 4 bits")
+            entries[rank >> 1] |= value << ((rank & 1) << 2)
+    else:
+        raise ValueError("a pattern database stores 4 or 8 bits per entry")
+    return PatternDatabase(board, pattern, goal_tiles, bits, entries)
+
+
+class PatternDatabaseHeuristic(Heuristic):
+    """
+    h(x) = the sum of the lookups in a set of pattern databases with disjoint patterns.
+    Only the database holding the moved tile can change between a parent and a child,
+    so update() does at most two lookups in one database.
+    """
+    databases: list[PatternDatabase]
+    database_of: list[PatternDatabase | None] # database_of[tile] = the database whose pattern has the tile
+
+    def __init__(self, problem, databases: Sequence[PatternDatabase]):
+        super().__init__(problem)
+        self.databases = list(databases)
+        self.database_of = [None] * (problem.width * problem.height)
+        goal_tiles = tuple(problem.goal_node.tiles())
+        for database in self.databases:
+            if database.board is not problem.board or database.goal_tiles != goal_tiles:
+                raise ValueError("the pattern database was built for a different board or goal")
+            for tile in database.pattern:
+                if self.database_of[tile] is not None:
+                    raise ValueError(f"tile {tile} is in more than one pattern, so the databases aren't additive")
+                self.database_of[tile] = database
+
+    @classmethod
+    def from_files(cls, problem, paths: Sequence[str | Path]) -> PatternDatabaseHeuristic:
+        return cls(problem, [PatternDatabase.load(path) for path in paths])
+
+    def estimate(self, state: PuzzleState) -> int:
+        return sum(database.lookup(state.state_id) for database in self.databases)
+
+    def update(self, parent_h: int, parent: PuzzleState, child: PuzzleState) -> int:
+        database = self.database_of[self.moved_tile(parent, child)]
+        if database is None:
+            return parent_h
+        return parent_h - database.lookup(parent.state_id) + database.lookup(child.state_id)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build and save additive pattern databases for a puzzle goal.")
+    parser.add_argument("patterns", nargs="+", help="comma-separated pattern tiles, e.g. 1,2,3,4,5,6")
+    parser.add_argument("--width", type=int, default=4)
+    parser.add_argument("--height", type=int, default=None)
+    parser.add_argument("--goal", default=None, help="goal tiles (default: 1 2 ... n 0)")
+    parser.add_argument("--bits", type=int, choices=(4, 8), default=8)
+    parser.add_argument("--out", default=".", help="directory for the database files")
+    args = parser.parse_args()
+
+    height = args.height or args.width
+    goal = args.goal or " ".join(str(tile) for tile in [*range(1, args.width * height), 0])
+    goal_node = StateNode.from_tiles(goal, width=args.width, height=height)
+    Path(args.out).mkdir(parents=True, exist_ok=True)
+    for pattern_argument in args.patterns:
+        pattern = [int(tile) for tile in pattern_argument.split(",")]
+        database = build_pattern_database(goal_node, pattern, args.bits)
+        path = Path(args.out) / f"pdb_{args.width}x{height}_{'-'.join(map(str, pattern))}.bin"
+        database.save(path)
+        print(f"saved {path} ({database.entry_count} entries)")
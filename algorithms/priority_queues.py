@@ -0,0 +1,210 @@
+"""
+Priority queues for the best-first-search frontiers.
+
+Every queue here stores (key, item) pairs and hands back the pair with the smallest key first.
+None of them support decrease-key directly: a frontier that finds a cheaper path to a state
+simply pushes the cheaper entry and skips the old one when it surfaces (lazy deletion, see
+dijkstra.Frontier).
+
+- BinaryHeapQueue: heapq-backed, works for any comparable keys. O(log n) push and pop.
+- BucketQueue: Dial's algorithm. A circular array of max_weight + 1 buckets indexed by key,
+  for non-negative integer keys that never go below the last popped key and never exceed it by
+  more than max_weight (exactly the keys Dijkstra produces on a graph with integer weights
+  in [0, max_weight]). O(1) push, pop is amortised O(1) plus the scan over empty buckets.
+- RadixHeapQueue: a radix heap for monotone non-negative integer keys. Entries live in buckets
+  by the highest bit in which their key differs from the last popped key, so each entry is
+  moved between buckets at most once per bit of the key range. No bound on edge weights needed.
+
+Ties are broken first-in-first-out in all three queues.
+"""
+from __future__ import annotations
+
+import heapq
+from collections import deque
+from itertools import count
+from typing import Any
+
+
+class PriorityQueue:
+    """
+    The interface shared by the queues in this module.
+    """
+    def push(self, key, item: Any) -> None:
+        raise NotImplementedError
+
+    def pop(self) -> tuple[Any, Any]:
+        # remove and return the (key, item) pair with the smallest key
+        raise NotImplementedError
+
+    def peek(self) -> tuple[Any, Any]:
+        # return the (key, item) pair with the smallest key without removing it
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def __bool__(self) -> bool:
+        return len(self) != 0
+
+
+class BinaryHeapQueue(PriorityQueue):
+    heap: list[tuple[Any, int, Any]]
+    counter: count
+
+    def __init__(self):
+        self.heap = []
+        # the insertion counter breaks ties, so items themselves are never compared
+        self.counter = count()
+
+    def push(self, key, item: Any) -> None:
+        heapq.heappush(self.heap, (key, next(self.counter), item))
+
+    def pop(self) -> tuple[Any, Any]:
+        if not self.heap:
+            raise IndexError("pop from an empty queue")
+        key, _, item = heapq.heappop(self.heap)
+        return key, item
+
+    def peek(self) -> tuple[Any, Any]:
+        if not self.heap:
+            raise IndexError("peek at an empty queue")
+        key, _, item = self.heap[0]
+        return key, item
+
+    def __len__(self) -> int:
+        return len(self.heap)
+
+
+class BucketQueue(PriorityQueue):
+    """
+    Dial's bucket queue.
+    With keys bounded to [last popped key, last popped key + max_weight], max_weight + 1 buckets
+    are enough to hold every key without two different keys sharing a bucket, so the buckets
+    are reused circularly as the search moves outwards.
+    """
+    buckets: list[deque]
+    max_weight: int
+    current_key: int # the key of the bucket the cursor is on (the last popped key)
+    size: int
+
+    def __init__(self, max_weight: int):
+        if max_weight < 0:
+            raise ValueError("max_weight must be non-negative")
+        self.max_weight = max_weight
+        self.buckets = [deque() for _ in range(max_weight + 1)]
+        self.current_key = 0
+        self.size = 0
+
+    def push(self, key: int, item: Any) -> None:
+        if not self.current_key <= key <= self.current_key + self.max_weight:
+            raise ValueError(f"key {key} is outside the bucket window "
+                             f"[{self.current_key}, {self.current_key + self.max_weight}]")
+        self.buckets[key % len(self.buckets)].append((key, item))
+        self.size += 1
+
+    def pop(self) -> tuple[int, Any]:
+        if not self.size:
+            raise IndexError("pop from an empty queue")
+        bucket = self._first_bucket()
+        self.size -= 1
+        return bucket.popleft()
+
+    def peek(self) -> tuple[int, Any]:
+        if not self.size:
+            raise IndexError("peek at an empty queue")
+        return self._first_bucket()[0]
+
+    def _first_bucket(self) -> deque:
+        # move the cursor forward to the first non-empty bucket (the queue isn't empty)
+        bucket_count = len(self.buckets)
+        bucket = self.buckets[self.current_key % bucket_count]
+        while not bucket:
+            self.current_key += 1
+            bucket = self.buckets[self.current_key % bucket_count]
+        return bucket
+
+    def __len__(self) -> int:
+        return self.size
+
+
+class RadixHeapQueue(PriorityQueue):
+    """
+    A radix heap for monotone integer keys.
+    Bucket 0 holds the entries whose key equals the last popped key, bucket i (i > 0) holds the
+    entries whose key first differs from it at bit i - 1. When bucket 0 runs out, the first
+    non-empty bucket is redistributed around its smallest key, which always lands that key
+    (and any equal keys) in bucket 0.
+    """
+    buckets: list[list[tuple[int, int, Any]]]
+    last_key: int
+    counter: count
+    size: int
+
+    def __init__(self):
+        self.buckets = [[] for _ in range(65)]
+        self.last_key = 0
+        self.counter = count()
+        self.size = 0
+
+    def push(self, key: int, item: Any) -> None:
+        if key < self.last_key:
+            raise ValueError(f"key {key} is smaller than the last popped key {self.last_key}")
+        index = (key ^ self.last_key).bit_length()
+        if index >= len(self.buckets):
+            self.buckets.extend([] for _ in range(index + 1 - len(self.buckets)))
+        self.buckets[index].append((key, next(self.counter), item))
+        self.size += 1
+
+    def pop(self) -> tuple[int, Any]:
+        if not self.size:
+            raise IndexError("pop from an empty queue")
+        self._fill_first_bucket()
+        self.size -= 1
+        key, _, item = heapq.heappop(self.buckets[0])
+        return key, item
+
+    def peek(self) -> tuple[int, Any]:
+        if not self.size:
+            raise IndexError("peek at an empty queue")
+        self._fill_first_bucket()
+        key, _, item = self.buckets[0][0]
+        return key, item
+
+    def _fill_first_bucket(self) -> None:
+        # (the queue isn't empty)
+        if self.buckets[0]:
+            return
+        index = 1
+        while not self.buckets[index]:
+            index += 1
+        entries = self.buckets[index]
+        self.buckets[index] = []
+        self.last_key = min(entries)[0]
+        for entry in entries:
+            self.buckets[(entry[0] ^ self.last_key).bit_length()].append(entry)
+        # bucket 0 only ever holds equal keys, so as a heap it orders them by insertion
+        heapq.heapify(self.buckets[0])
+
+    def __len__(self) -> int:
+        return self.size
+
+
+QUEUE_TYPES: dict[str, type[PriorityQueue]] = {
+    "heap": BinaryHeapQueue,
+    "bucket": BucketQueue,
+    "radix": RadixHeapQueue,
+}
+
+
+def make_queue(queue_type: str, max_weight: int | None = None) -> PriorityQueue:
+    """
+    Build an empty queue by name ("heap", "bucket" or "radix").
+    max_weight is only used by (and is required for) the bucket queue.
+    """
+    if queue_type not in QUEUE_TYPES:
+        raise ValueError(f"unknown queue type {queue_type!r}, expected one of {sorted(QUEUE_TYPES)}")
+    if queue_type == "bucket":
+        if max_weight is None:
+            raise ValueError("the bucket queue needs the maximum edge weight")
+        return BucketQueue(max_weight)
+    return QUEUE_TYPES[queue_type]()
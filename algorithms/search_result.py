@@ -0,0 +1,58 @@
+"""
+The result object returned by the solvers' solve() methods.
+
+The path is built lazily: a solver can pass path_builder (a function that walks its parent links
+back from the goal) instead of the path itself, and the walk only happens the first time
+result.path is read. Callers that only want the status and the cost (e.g. a batch of cost
+queries) never pay for the path.
+"""
+from __future__ import annotations
+
+from enum import Enum
+from typing import Callable, Hashable
+
+
+class SearchStatus(Enum):
+    SUCCESS = "success" # the goal was reached
+    FAILURE = "failure" # the search finished without reaching the goal
+    UNSOLVABLE = "unsolvable" # the goal was shown to be unreachable without searching
+
+
+class SearchResult:
+    __slots__ = ("status", "cost", "expanded", "generated", "path_builder", "built_path")
+    status: SearchStatus
+    cost: int | float | None # the path cost to the goal, if it was reached
+    expanded: int # nodes taken off the frontier and expanded (0 if the solver doesn't count them)
+    generated: int # nodes generated as children (0 if the solver doesn't count them)
+    path_builder: Callable[[], list[Hashable]] | None # builds the path on first access, then dropped
+    built_path: list[Hashable] | None
+
+    def __init__(self, status: SearchStatus, cost: int | float | None = None, path: list[Hashable] | None = None,
+                 expanded: int = 0, generated: int = 0, path_builder: Callable[[], list[Hashable]] | None = None):
+        self.status = status
+        self.cost = cost
+        self.expanded = expanded
+        self.generated = generated
+        self.path_builder = path_builder
+        self.built_path = path
+
+    @property
+    def path(self) -> list[Hashable] | None:
+        # the states from start to goal, if the goal was reached
+        if self.path_builder is not None:
+            self.built_path = self.path_builder()
+            self.path_builder = None
+        return self.built_path
+
+    @path.setter
+    def path(self, path: list[Hashable] | None) -> None:
+        self.path_builder = None
+        self.built_path = path
+
+    @property
+    def success(self) -> bool:
+        return self.status is SearchStatus.SUCCESS
+
+    def __repr__(self):
+        return (f"SearchResult(status={self.status.value}, cost={self.cost}, path={self.path}, "
+                f"expanded={self.expanded}, generated={self.generated})")
@@ -0,0 +1,258 @@
+"""
+A result cache in front of the sliding tile puzzle solvers, for workloads with many repeated queries.
+
+Two instances have the same solution (up to renaming) when one can be turned into the other by:
+- relabelling the tiles: the numbers on the tiles don't matter, only where each one has to go. Renaming
+  the tiles so the goal reads 1, 2, 3, ... in square order (skipping the blank) maps any (start, goal)
+  pair to (relabelled start, a goal fixed by the blank's square alone).
+- a symmetry of the board, applied to the start and the goal together: the mirror images and the
+  rotations. A square board has 8 (the dihedral group D4), any other board 4 (identity, the two
+  mirrors and the half turn), since the quarter turns and diagonal mirrors change its shape.
+The canonical form of an instance is the smallest (goal blank square, relabelled start) over all the
+symmetries: every instance in the same class gets the same key, so e.g. all 8 mirror images and
+rotations of an 8-puzzle, to any goal, are solved once.
+
+A symmetry moves the squares, and the moves with them: e.g. under the left-right mirror the blank
+moving right becomes the blank moving left. The cache stores the canonical instance's moves, and
+maps each one back through the symmetry it was found under, so the caller gets moves (and a path)
+for their own board.
+
+The cache itself is a bounded LRU in memory (an OrderedDict, oldest first), with an optional
+persistent tier on disk (a shelve file): a miss in memory falls through to the disk, and a miss on
+both solves the canonical instance with solver_type and stores it in both.
+Unsolvable instances are cached too (they are cheap to check, but cost nothing to store).
+"""
+from __future__ import annotations
+
+import shelve
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Callable, Hashable
+
+from algorithms.a_star import MOVE_NAMES, Board, Problem, Solver, StateNode, parse_tiles
+from algorithms.heuristics import Heuristic, make_heuristic
+from algorithms.search_result import SearchResult, SearchStatus
+
+# the (row, column) step of the blank for each move in a_star.MOVE_NAMES
+MOVE_STEPS = ((-1, 0), (1, 0), (0, 1), (0, -1))
+
+# the solution stored for a canonical instance: (status, cost, moves in the canonical frame)
+CachedSolution = tuple[str, int | None, bytes | None]
+
+
+class Symmetry:
+    """
+    One symmetry of a width x height board: where each square goes, and what each move becomes.
+    """
+    squares: list[int] # squares[i] = the square that square i moves to
+    moves: list[int] # moves[move] = the move it becomes
+    inverse_moves: list[int] # inverse_moves[moves[move]] = move
+
+    def __init__(self, width: int, height: int, transform: Callable[[int, int], tuple[int, int]]):
+        self.squares = []
+        for index in range(width * height):
+            row, column = transform(*divmod(index, width))
+            self.squares.append(row * width + column)
+        # the transforms are affine, so a step maps to the difference of the mapped end points
+        origin = transform(0, 0)
+        self.moves = []
+        for row_step, column_step in MOVE_STEPS:
+            row, column = transform(row_step, column_step)
+            self.moves.append(MOVE_STEPS.index((row - origin[0], column - origin[1])))
+        self.inverse_moves = [0] * len(MOVE_STEPS)
+        for move, mapped_move in enumerate(self.moves):
+            self.inverse_moves[mapped_move] = move
+
+
+@lru_cache(maxsize=None)
+def board_symmetries(width: int, height: int) -> list[Symmetry]:
+    """
+    The identity first, then the mirrors and rotations that keep a width x height board's shape.
+    """
+    last_row, last_column = height - 1, width - 1
+    transforms = [
+        lambda row, column: (row, column),
+        lambda row, column: (row, last_column - column), # left-right mirror
+        lambda row, column: (last_row - row, column), # top-bottom mirror
+        lambda row, column: (last_row - row, last_column - column), # half turn
+    ]
+    if width == height:
+        transforms += [
+            lambda row, column: (column, row), # main diagonal mirror
+            lambda row, column: (last_column - column, last_row - row), # other diagonal mirror
+            lambda row, column: (column, last_row - row), # quarter turn clockwise
+            lambda row, column: (last_column - column, row), # quarter turn anticlockwise
+        ]
+    return [Symmetry(width, height, transform) for transform in transforms]
+
+
+def canonical_goal(size: int, goal_blank: int) -> list[int]:
+    # the relabelled goal: 1, 2, 3, ... in square order, with the blank on goal_blank
+    tiles = list(range(1, size))
+    tiles.insert(goal_blank, 0)
+    return tiles
+
+
+def canonicalize(start_tiles: list[int], goal_tiles: list[int], symmetry: Symmetry) -> tuple[int, list[int]]:
+    """
+    (the goal's blank square, the relabelled start) after moving both boards through symmetry.
+    """
+    size = len(start_tiles)
+    moved_start = [0] * size
+    moved_goal = [0] * size
+    for index, square in enumerate(symmetry.squares):
+        moved_start[square] = start_tiles[index]
+        moved_goal[square] = goal_tiles[index]
+    # each tile's new label is its square's place in canonical_goal()
+    labels = [0] * size
+    label = 1
+    for tile in moved_goal:
+        if tile != 0:
+            labels[tile] = label
+            label += 1
+    return moved_goal.index(0), [labels[tile] for tile in moved_start]
+
+
+def path_moves(path: list[Hashable], width: int) -> list[int]:
+    # the moves along a solution path of boards (as the solvers return them), from the blank's squares
+    blanks = [parse_tiles(state).index(0) for state in path]
+    steps = {-width: 0, width: 1, 1: 2, -1: 3}
+    return [steps[next_blank - blank] for blank, next_blank in zip(blanks, blanks[1:])]
+
+
+class SolverCache:
+    solver_type: type # a_star.Solver, ida_star.IDAStarSolver, ... anything built with (problem, heuristic)
+    heuristic: str
+    max_entries: int
+    entries: OrderedDict[str, CachedSolution] # key --> solution, least recently used first
+    disk: shelve.Shelf | None
+    heuristics: dict[tuple[int, int, int], Heuristic] # (width, height, goal blank) --> heuristic
+    hits: int
+    disk_hits: int
+    misses: int
+
+    def __init__(self, solver_type: type = Solver, heuristic: str = "linear_conflict", max_entries: int = 100_000,
+                 path: str | None = None):
+        self.solver_type = solver_type
+        self.heuristic = heuristic
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.disk = shelve.open(path) if path is not None else None
+        self.heuristics = {}
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def close(self) -> None:
+        if self.disk is not None:
+            self.disk.close()
+            self.disk = None
+
+    def __enter__(self) -> SolverCache:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def key_of(self, problem: Problem) -> tuple[str, int, list[int], Symmetry]:
+        """
+        The cache key of problem's class, and its canonical form: the goal blank, the relabelled start
+        and the symmetry that gives them.
+        """
+        board = problem.board
+        start_tiles = problem.start_node.tiles()
+        goal_tiles = problem.goal_node.tiles()
+        best = None
+        for symmetry in board_symmetries(board.width, board.height):
+            goal_blank, relabelled_start = canonicalize(start_tiles, goal_tiles, symmetry)
+            if best is None or (goal_blank, relabelled_start) < best[:2]:
+                best = goal_blank, relabelled_start, symmetry
+        goal_blank, relabelled_start, symmetry = best
+        key = f"{board.width}x{board.height}:{goal_blank}:{' '.join(map(str, relabelled_start))}"
+        return key, goal_blank, relabelled_start, symmetry
+
+    def lookup(self, key: str) -> CachedSolution | None:
+        solution = self.entries.get(key)
+        if solution is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return solution
+        if self.disk is not None and key in self.disk:
+            self.disk_hits += 1
+            solution = self.disk[key]
+            self.store(key, solution, to_disk=False)
+            return solution
+        return None
+
+    def store(self, key: str, solution: CachedSolution, to_disk: bool = True) -> None:
+        self.entries[key] = solution
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        if to_disk and self.disk is not None:
+            self.disk[key] = solution
+
+    def solve_canonical(self, board: Board, goal_blank: int, relabelled_start: list[int]) -> CachedSolution:
+        canonical_problem = Problem(StateNode.from_tiles(relabelled_start, board.width, board.height),
+                                    StateNode.from_tiles(canonical_goal(board.size, goal_blank),
+                                                         board.width, board.height))
+        # the canonical goals only differ by the blank's square, so there are few heuristics to build
+        heuristic_key = (board.width, board.height, goal_blank)
+        if heuristic_key not in self.heuristics:
+            self.heuristics[heuristic_key] = make_heuristic(self.heuristic, canonical_problem)
+        result = self.solver_type(canonical_problem, self.heuristics[heuristic_key]).solve()
+        moves = bytes(path_moves(result.path, board.width)) if result.success else None
+        return result.status.value, result.cost, moves
+
+    def solution_moves(self, problem: Problem) -> tuple[SearchStatus, int | None, list[int] | None]:
+        """
+        (status, cost, moves) for problem, with the moves (see a_star.MOVE_NAMES) for problem's own board.
+        """
+        key, goal_blank, relabelled_start, symmetry = self.key_of(problem)
+        solution = self.lookup(key)
+        if solution is None:
+            self.misses += 1
+            solution = self.solve_canonical(problem.board, goal_blank, relabelled_start)
+            self.store(key, solution)
+        status, cost, canonical_moves = solution
+        if canonical_moves is None:
+            return SearchStatus(status), cost, None
+        return SearchStatus(status), cost, [symmetry.inverse_moves[move] for move in canonical_moves]
+
+    def solve(self, problem: Problem) -> SearchResult:
+        """
+        The same result as solver_type(problem).solve(): the path is rebuilt from the mapped moves.
+        """
+        status, cost, moves = self.solution_moves(problem)
+        if moves is None:
+            return SearchResult(status, cost)
+        state = problem.start_node
+        solution_path = [str(state)]
+        move_table = problem.moves
+        for move in moves:
+            swap_index = next(swap_index for table_move, swap_index in move_table[state.blank_index]
+                              if table_move == move)
+            state = problem.apply(state, swap_index)
+            solution_path.append(str(state))
+        return SearchResult(status, cost, solution_path)
+
+
+if __name__ == "__main__":
+    from algorithms.ida_star import IDAStarSolver
+
+    cache = SolverCache(IDAStarSolver)
+    goal_node_1 = StateNode.from_tiles("123804765")
+    result_1 = cache.solve(Problem(StateNode.from_tiles("283164705"), goal_node_1))
+    assert result_1.cost == 5 and result_1.path[-1] == "123804765"
+    # the left-right mirror image of both boards is the same instance
+    result_2 = cache.solve(Problem(StateNode.from_tiles("382461507"), StateNode.from_tiles("321408567")))
+    assert result_2.cost == 5 and result_2.path[-1] == "321408567"
+    # and so is any relabelling of the tiles, e.g. 1 <--> 8, 2 <--> 7, ...
+    relabel = str.maketrans("12345678", "87654321")
+    result_3 = cache.solve(Problem(StateNode.from_tiles("283164705".translate(relabel)),
+                                   StateNode.from_tiles("123804765".translate(relabel))))
+    assert result_3.cost == 5 and result_3.path[-1] == "876105234"
+    assert (cache.hits, cache.misses) == (2, 1)
+    _, _, moves_1 = cache.solution_moves(Problem(StateNode.from_tiles("283164705"), goal_node_1))
+    _, _, moves_2 = cache.solution_moves(Problem(StateNode.from_tiles("382461507"), StateNode.from_tiles("321408567")))
+    print(f"moves: {[MOVE_NAMES[move] for move in moves_1]}, mirrored: {[MOVE_NAMES[move] for move in moves_2]}")
+    print("done.")
@@ -0,0 +1,197 @@
+"""
+Level-synchronous breadth first search with NumPy, for large sparse graphs and trees in CSR form
+(graphs/csr.py's CSRGraph, or graphs/compact_tree.py's CompactTree).
+
+breadth_first_search.Traverser takes one node off the queue per Python loop. Here a whole level
+(the frontier) is expanded at once, with array operations:
+- top-down step: gather the neighbour slices of every frontier node into one array, mask out the
+  nodes already visited, keep the first copy of each remaining node, and assign the depth and
+  parent of the whole next level in bulk.
+- bottom-up step (Beamer, Asanović & Patterson's direction-optimizing BFS): when the frontier is
+  big, most of its edges lead to nodes already visited, so instead every unvisited node looks
+  through its incoming edges for a parent in the frontier.
+The search switches to bottom-up when the frontier's edges outnumber the edges into unvisited
+nodes / alpha, and back to top-down when the frontier shrinks below node_count / beta.
+
+Visit order: the result is the order the one-node-at-a-time BFS would visit the nodes in, with
+each node's parent being the first node to reach it. Within a level, nodes are sorted by the key
+(rank of the parent in the frontier, position of the edge in the parent's adjacency), which both
+steps compute: the top-down gather is already in that order, the bottom-up step picks the smallest
+key for each node and sorts by it. So on the trees in breadth_first_search.py the order is the
+one its asserts check.
+
+Returns three arrays over node indexes: order (the nodes in visit order), depths (-1 where
+unreachable) and parents (-1 for the source and unreachable nodes).
+"""
+from __future__ import annotations
+
+import numpy as np
+
+from graphs.compact_tree import CompactTree
+from graphs.csr import CSRGraph
+
+# the switching thresholds. Beamer et al. use alpha = 14, but their bottom-up step stops at the first
+# parent it finds, while this one checks every incoming edge of every unvisited node (to find the
+# first parent in visit order), so here it only pays once the frontier has about as many edges
+ALPHA = 1
+BETA = 24
+NOT_REACHED = np.iinfo(np.int64).max
+
+
+class ReverseAdjacency:
+    """
+    The incoming edges of each node, in CSR form: the source node and the position of each edge in
+    the forward arrays (which gives its place in the source's adjacency).
+    """
+    offsets: np.ndarray
+    sources: np.ndarray
+    edge_ids: np.ndarray
+
+    def __init__(self, offsets: np.ndarray, targets: np.ndarray):
+        node_count = len(offsets) - 1
+        sources = np.repeat(np.arange(node_count, dtype=np.int64), np.diff(offsets))
+        # the order within each node's incoming edges doesn't matter, so no need for a (slower) stable sort
+        self.edge_ids = np.argsort(targets)
+        self.sources = sources[self.edge_ids]
+        self.offsets = np.zeros(node_count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(targets, minlength=node_count), out=self.offsets[1:])
+
+
+def csr_arrays(graph: CSRGraph | CompactTree) -> tuple[np.ndarray, np.ndarray]:
+    if isinstance(graph, CompactTree):
+        return graph.child_offsets, graph.child_ids
+    return graph.indptr, graph.indices
+
+
+def gather(offsets: np.ndarray, nodes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    The positions of the edges of every node in nodes, concatenated in order, and which entry of
+    nodes each one belongs to.
+    """
+    starts = offsets[nodes]
+    counts = offsets[nodes + 1] - starts
+    total = int(counts.sum())
+    owners = np.repeat(np.arange(len(nodes), dtype=np.int64), counts)
+    # block i covers output positions block_starts[i]... and edge positions starts[i]...
+    block_starts = np.cumsum(counts) - counts
+    positions = np.arange(total, dtype=np.int64) - np.repeat(block_starts - starts, counts)
+    return positions, owners
+
+
+def level_synchronous_bfs(graph: CSRGraph | CompactTree, source_index: int = 0, direction_optimizing: bool = True,
+                          alpha: float = ALPHA, beta: float = BETA, reverse: ReverseAdjacency | None = None
+                          ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    BFS from source_index. Pass reverse (ReverseAdjacency(offsets, targets) for the same graph) to
+    reuse it over several searches; otherwise it is built the first time a bottom-up step runs.
+    """
+    offsets, targets = csr_arrays(graph)
+    node_count = len(offsets) - 1
+    edge_count = max(len(targets), 1)
+    out_degrees = np.diff(offsets)
+    in_degrees = np.bincount(targets, minlength=node_count)
+    depths = np.full(node_count, -1, dtype=np.int64)
+    parents = np.full(node_count, -1, dtype=np.int64)
+    visited = np.zeros(node_count, dtype=bool)
+    # scratch for the top-down step, all NOT_REACHED between levels
+    first_position = np.full(node_count, NOT_REACHED, dtype=np.int64)
+    depths[source_index] = 0
+    visited[source_index] = True
+    levels = [np.array([source_index], dtype=np.int64)]
+    frontier = levels[0]
+    # edges into nodes not yet visited: the work a bottom-up step would do
+    unvisited_edges = int(in_degrees.sum()) - int(in_degrees[source_index])
+    bottom_up = False
+    depth = 0
+    while len(frontier):
+        depth += 1
+        if direction_optimizing:
+            frontier_edges = int(out_degrees[frontier].sum())
+            if not bottom_up and frontier_edges > unvisited_edges / alpha:
+                bottom_up = True
+            elif bottom_up and len(frontier) < node_count / beta:
+                bottom_up = False
+        if bottom_up:
+            if reverse is None:
+                reverse = ReverseAdjacency(offsets, targets)
+            frontier_rank = np.full(node_count, -1, dtype=np.int64)
+            frontier_rank[frontier] = np.arange(len(frontier))
+            unvisited = np.flatnonzero(~visited)
+            positions, owners = gather(reverse.offsets, unvisited)
+            ranks = frontier_rank[reverse.sources[positions]]
+            in_frontier = ranks >= 0
+            owners = owners[in_frontier]
+            # the (rank, edge) key as one number, so the smallest per node is one reduceat()
+            keys = ranks[in_frontier] * edge_count + reverse.edge_ids[positions[in_frontier]]
+            # owners is sorted, so each node reached has one run of entries
+            group_starts = np.flatnonzero(np.r_[True, owners[1:] != owners[:-1]]) if len(owners) else owners
+            best_keys = np.minimum.reduceat(keys, group_starts) if len(owners) else keys
+            order = np.argsort(best_keys)
+            next_frontier = unvisited[owners[group_starts[order]]]
+            next_parents = frontier[best_keys[order] // edge_count]
+        else:
+            positions, owners = gather(offsets, frontier)
+            neighbours = targets[positions].astype(np.int64)
+            fresh = ~visited[neighbours]
+            neighbours, owners = neighbours[fresh], owners[fresh]
+            # the first copy of each node, kept in gather order: the smallest position of each node
+            # in the gathered array (np.minimum.at is much faster than sorting with np.unique)
+            gather_positions = np.arange(len(neighbours), dtype=np.int64)
+            np.minimum.at(first_position, neighbours, gather_positions)
+            first = np.flatnonzero(first_position[neighbours] == gather_positions)
+            first_position[neighbours] = NOT_REACHED
+            next_frontier = neighbours[first]
+            next_parents = frontier[owners[first]]
+        visited[next_frontier] = True
+        depths[next_frontier] = depth
+        parents[next_frontier] = next_parents
+        unvisited_edges -= int(in_degrees[next_frontier].sum())
+        levels.append(next_frontier)
+        frontier = next_frontier
+    return np.concatenate(levels), depths, parents
+
+
+if __name__ == "__main__":
+    from collections import deque
+    from time import perf_counter
+
+    from algorithms.breadth_first_search import parent_node, parent_node_2
+
+    for root_node, expected_ids in ((parent_node, [0, 7, 5, 3, 2, 4, 1, 6]),
+                                    (parent_node_2, ["A", "B", "C", "D", "E", "F", "N", "G", "H", "I", "J", "K"])):
+        tree = CompactTree.from_node(root_node)
+        for direction_optimizing_1 in (False, True):
+            order_1, depths_1, parents_1 = level_synchronous_bfs(tree, direction_optimizing=direction_optimizing_1)
+            assert [tree.id_of(index) for index in order_1.tolist()] == expected_ids # breadth first order
+
+    # a random sparse graph: the vectorized search against one node per loop
+    rng = np.random.default_rng(0)
+    node_count_1, edge_count_1 = 1_000_000, 4_000_000
+    sources_1 = rng.integers(node_count_1, size=edge_count_1)
+    targets_1 = rng.integers(node_count_1, size=edge_count_1)
+    graph_1 = CSRGraph.from_arrays(list(range(node_count_1)), np.concatenate([sources_1, targets_1]),
+                                   np.concatenate([targets_1, sources_1]), np.ones(2 * edge_count_1, dtype=np.int64),
+                                   directed=False)
+    # the reverse adjacency is built once per graph, like the CSRGraph itself
+    reverse_1 = ReverseAdjacency(graph_1.indptr, graph_1.indices)
+    start_time = perf_counter()
+    order_2, depths_2, parents_2 = level_synchronous_bfs(graph_1, reverse=reverse_1)
+    vectorized_time = perf_counter() - start_time
+
+    start_time = perf_counter()
+    indptr_1, indices_1 = graph_1.indptr.tolist(), graph_1.indices.tolist()
+    seen = [False] * node_count_1
+    seen[0] = True
+    queue = deque([0])
+    loop_order = []
+    while queue:
+        index_1 = queue.popleft()
+        loop_order.append(index_1)
+        for child_1 in indices_1[indptr_1[index_1]:indptr_1[index_1 + 1]]:
+            if not seen[child_1]:
+                seen[child_1] = True
+                queue.append(child_1)
+    loop_time = perf_counter() - start_time
+    print(f"vectorized: {vectorized_time:.2f}s, one node per loop: {loop_time:.2f}s, {len(order_2)} nodes reached")
+    assert order_2.tolist() == loop_order
+    print("done.")
@@ -0,0 +1,200 @@
+"""
+A compact, array-backed tree: the same shape as a tree of graphs.node.Node objects, in a few NumPy
+arrays instead of one Python object (and one children list) per node.
+
+Nodes are numbered 0..n-1 (the root is 0) and the children are stored in CSR form, like graphs/csr.py:
+- child_offsets: length n + 1. The children of node i are child_ids[child_offsets[i]:child_offsets[i + 1]].
+- child_ids:     the index of each child, grouped by parent.
+- node_ids:      the id table: index --> the original node_id. A NumPy int64 array when every id is
+                 an int, otherwise a list.
+
+e.g. for the tree   0
+                    ├──┬──┐
+                    7  5  3
+                    │
+                    2
+node_ids      = [0, 7, 5, 3, 2]
+child_offsets = [0, 3, 4, 4, 4, 4]
+child_ids     = [1, 2, 3, 4]
+
+The traversers in algorithms/ only use node.node_id and node.children, so they take a CompactTree
+(or a CompactNode view of it) in place of a Node: CompactNode is a small view object, made on
+demand as the walk reaches each node, which gives the same two attributes.
+"""
+from __future__ import annotations
+
+from typing import Hashable, Iterable
+
+import numpy as np
+
+from graphs.node import Node
+
+
+class CompactTree:
+    node_ids: np.ndarray | list[Hashable]
+    child_offsets: np.ndarray
+    child_ids: np.ndarray
+
+    def __init__(self, node_ids: np.ndarray | list[Hashable], child_offsets: np.ndarray, child_ids: np.ndarray):
+        self.node_ids = node_ids
+        self.child_offsets = child_offsets
+        self.child_ids = child_ids
+
+    @property
+    def node_count(self) -> int:
+        return len(self.child_offsets) - 1
+
+    @classmethod
+    def from_node(cls, root: Node) -> CompactTree:
+        """
+        Convert a tree of Nodes, numbering the nodes in breadth first order (without recursion).
+        """
+        node_ids = []
+        child_counts = []
+        queue = [root]
+        for node in queue:
+            node_ids.append(node.node_id)
+            child_counts.append(len(node.children))
+            queue.extend(node.children)
+        # in breadth first order each node's children come right after the children of the nodes before it
+        child_offsets = np.zeros(len(queue) + 1, dtype=np.int64)
+        np.cumsum(child_counts, out=child_offsets[1:])
+        child_ids = np.arange(1, len(queue), dtype=index_dtype(len(queue)))
+        return cls(id_table(node_ids), child_offsets, child_ids)
+
+    @classmethod
+    def from_edges(cls, edges: Iterable[tuple[Hashable, Hashable]], root_id: Hashable | None = None) -> CompactTree:
+        """
+        Build from (parent node_id, child node_id) pairs. Children keep the order of their edges.
+        The root is root_id, or else the one node that is never a child.
+        Raises ValueError unless the edges form one tree: a node with two parents, a root with a
+        parent, or nodes the root can't reach (a cycle) would make a corrupt layout.
+        """
+        index_of: dict[Hashable, int] = {}
+        if root_id is not None:
+            index_of[root_id] = 0
+        parents = []
+        children = []
+        for parent_id, child_id in edges:
+            parents.append(index_of.setdefault(parent_id, len(index_of)))
+            children.append(index_of.setdefault(child_id, len(index_of)))
+        if not index_of:
+            raise ValueError("a tree needs at least one node")
+        parents = np.array(parents, dtype=np.int64)
+        children = np.array(children, dtype=np.int64)
+        if root_id is None:
+            is_child = np.zeros(len(index_of), dtype=bool)
+            is_child[children] = True
+            roots = np.flatnonzero(~is_child)
+            if len(roots) != 1:
+                raise ValueError(f"expected one node that is never a child, found {len(roots)}: pass root_id")
+            root = int(roots[0])
+        else:
+            root = 0
+        # renumber so the root is 0 (swapping it with whichever node got 0)
+        renumber = np.arange(len(index_of), dtype=np.int64)
+        renumber[[0, root]] = renumber[[root, 0]]
+        parents, children = renumber[parents], renumber[children]
+        node_ids = list(index_of)
+        node_ids[0], node_ids[root] = node_ids[root], node_ids[0]
+        parent_counts = np.bincount(children, minlength=len(node_ids))
+        if parent_counts[0]:
+            raise ValueError(f"the root {node_ids[0]!r} is a child of another node")
+        if len(children) and parent_counts.max() > 1:
+            repeated = int(np.flatnonzero(parent_counts > 1)[0])
+            raise ValueError(f"node {node_ids[repeated]!r} is a child of more than one node")
+        # a stable sort keeps the children of each node in the order they were given
+        order = np.argsort(parents, kind="stable")
+        child_offsets = np.zeros(len(node_ids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(parents, minlength=len(node_ids)), out=child_offsets[1:])
+        child_ids = children[order].astype(index_dtype(len(node_ids)))
+        # every node has one parent now, so any node the root can't reach is on a cycle
+        reached = 1
+        level = np.zeros(1, dtype=np.int64)
+        while len(level):
+            level = np.concatenate([child_ids[child_offsets[node]:child_offsets[node + 1]] for node in level.tolist()])
+            reached += len(level)
+        if reached != len(node_ids):
+            raise ValueError(f"{len(node_ids) - reached} nodes can't be reached from the root {node_ids[0]!r}")
+        return cls(id_table(node_ids), child_offsets, child_ids)
+
+    def id_of(self, index: int) -> Hashable:
+        node_id = self.node_ids[index]
+        return int(node_id) if isinstance(self.node_ids, np.ndarray) else node_id
+
+    def children_of(self, index: int) -> np.ndarray:
+        return self.child_ids[self.child_offsets[index]:self.child_offsets[index + 1]]
+
+    def root_node(self) -> CompactNode:
+        return CompactNode(self, 0)
+
+    def to_node(self) -> Node:
+        # back to a tree of Node objects (without recursion)
+        nodes = [Node(self.id_of(index)) for index in range(self.node_count)]
+        for index, node in enumerate(nodes):
+            node.children = [nodes[child] for child in self.children_of(index).tolist()]
+        return nodes[0]
+
+
+class CompactNode:
+    """
+    A view of one node of a CompactTree, with the same node_id and children attributes as a Node.
+    Views are made as needed and can be thrown away: two views of the same node are equal.
+    """
+    __slots__ = ("tree", "index")
+    tree: CompactTree
+    index: int
+
+    def __init__(self, tree: CompactTree, index: int):
+        self.tree = tree
+        self.index = index
+
+    @property
+    def node_id(self) -> Hashable:
+        return self.tree.id_of(self.index)
+
+    @property
+    def children(self) -> list[CompactNode]:
+        tree = self.tree
+        return [CompactNode(tree, child) for child in tree.children_of(self.index).tolist()]
+
+    def __eq__(self, other):
+        return isinstance(other, CompactNode) and other.tree is self.tree and other.index == self.index
+
+    def __hash__(self):
+        return hash((id(self.tree), self.index))
+
+    def __repr__(self):
+        return f"CompactNode({self.node_id!r})"
+
+
+def as_node(node: Node | CompactNode | CompactTree) -> Node | CompactNode:
+    # lets the traversers take a whole CompactTree where they take a start node
+    return node.root_node() if isinstance(node, CompactTree) else node
+
+
+def id_table(node_ids: list[Hashable]) -> np.ndarray | list[Hashable]:
+    if node_ids and all(type(node_id) is int for node_id in node_ids):
+        try:
+            return np.array(node_ids, dtype=np.int64)
+        except OverflowError:
+            pass
+    return node_ids
+
+
+def index_dtype(node_count: int) -> type:
+    return np.int32 if node_count < 2**31 else np.int64
+
+
+if __name__ == "__main__":
+    root_node = Node(0, [Node(7, [Node(2)]), Node(5), Node(3)])
+    tree_1 = CompactTree.from_node(root_node)
+    print(f"node_ids: {tree_1.node_ids}, child_offsets: {tree_1.child_offsets}, child_ids: {tree_1.child_ids}")
+    assert [child.node_id for child in tree_1.root_node().children] == [7, 5, 3]
+
+    tree_2 = CompactTree.from_edges([("B", "E"), ("A", "B"), ("A", "C"), ("B", "F")])
+    assert tree_2.root_node().node_id == "A"
+    assert [child.node_id for child in tree_2.root_node().children] == ["B", "C"]
+    assert [child.node_id for child in tree_2.root_node().children[0].children] == ["E", "F"]
+    assert [child.node_id for child in tree_2.to_node().children[0].children] == ["E", "F"]
+    print("done.")
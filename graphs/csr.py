@@ -0,0 +1,105 @@
+"""
+A compact, read-only snapshot of a networkx graph in compressed sparse row (CSR) form.
+
+Node ids (any hashable) are mapped to integer indices 0..n-1 once, and the adjacency is stored
+in three NumPy arrays:
+- indptr:  length n + 1. The out-edges of node i are the entries indptr[i]:indptr[i + 1]
+           of the two arrays below.
+- indices: the index of the node at the other end of each edge.
+- weights: the weight of each edge.
+
+An undirected edge is stored once in each direction. Searches can then run on integer indices
+and only translate back to the original node ids for the path they return.
+directed records whether the edges were directed (from a DiGraph, or from_arrays() unless told
+otherwise), for the searches that only work on undirected graphs or need the reversed graph.
+
+e.g. for the graph  A ─2─ B ─5─ C
+node_ids = ['A', 'B', 'C']
+indptr   = [0, 1, 3, 4]
+indices  = [1, 0, 2, 1]
+weights  = [2, 2, 5, 5]
+"""
+from __future__ import annotations
+
+from typing import Hashable
+
+import numpy as np
+from networkx.classes import Graph
+
+
+class CSRGraph:
+    node_ids: list[Hashable] # int index --> original node id
+    index_of: dict[Hashable, int] # original node id --> int index
+    indptr: np.ndarray
+    indices: np.ndarray
+    weights: np.ndarray
+    directed: bool
+
+    def __init__(self, node_ids: list[Hashable], indptr: np.ndarray, indices: np.ndarray, weights: np.ndarray,
+                 directed: bool = True):
+        self.node_ids = node_ids
+        self.index_of = {node_id: index for index, node_id in enumerate(node_ids)}
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+        self.directed = directed
+
+    @classmethod
+    def from_networkx(cls, graph: Graph, weight: str = "weight") -> CSRGraph:
+        """
+        Convert a networkx Graph (or DiGraph) into CSR form. Edges without a weight attribute
+        get weight 1. The weights array is int64 if every weight is an integer, float64 otherwise.
+        """
+        node_ids = list(graph.nodes)
+        index_of = {node_id: index for index, node_id in enumerate(node_ids)}
+        edge_count = graph.number_of_edges()
+        # graph.edges() on an undirected graph yields each edge once, so store both directions
+        directions = 1 if graph.is_directed() else 2
+        sources = np.empty(edge_count * directions, dtype=np.int64)
+        targets = np.empty(edge_count * directions, dtype=np.int64)
+        edge_weights = []
+        for position, (u, v, w) in enumerate(graph.edges(data=weight, default=1)):
+            sources[position] = index_of[u]
+            targets[position] = index_of[v]
+            edge_weights.append(w)
+        if directions == 2:
+            sources[edge_count:] = targets[:edge_count]
+            targets[edge_count:] = sources[:edge_count]
+            edge_weights += edge_weights
+        weights = np.asarray(edge_weights)
+        if not np.issubdtype(weights.dtype, np.integer):
+            weights = weights.astype(np.float64)
+        else:
+            weights = weights.astype(np.int64)
+        return cls.from_arrays(node_ids, sources, targets, weights, directed=graph.is_directed())
+
+    @classmethod
+    def from_arrays(cls, node_ids: list[Hashable], sources: np.ndarray, targets: np.ndarray,
+                    weights: np.ndarray, directed: bool = True) -> CSRGraph:
+        """
+        Build from parallel arrays of directed edges given as int indices into node_ids.
+        Pass directed=False if the arrays hold every edge in both directions, i.e. an undirected graph.
+        """
+        # a stable sort keeps the edges of each node in the order they were given
+        order = np.argsort(sources, kind="stable")
+        indptr = np.zeros(len(node_ids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=len(node_ids)), out=indptr[1:])
+        index_dtype = np.int32 if len(node_ids) < 2**31 else np.int64
+        return cls(node_ids, indptr, targets[order].astype(index_dtype), weights[order], directed)
+
+    @property
+    def node_count(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def edge_count(self) -> int:
+        # the number of stored (directed) edges
+        return len(self.indices)
+
+    def neighbours(self, index: int) -> tuple[np.ndarray, np.ndarray]:
+        # the neighbour indices of a node and the weights of the edges to them
+        start, end = self.indptr[index], self.indptr[index + 1]
+        return self.indices[start:end], self.weights[start:end]
+
+    def max_weight(self):
+        return self.weights.max() if len(self.weights) else 0
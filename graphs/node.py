@@ -2,6 +2,7 @@ class Node:
     """
     Node in a tree graph with an arbitrary number of children
     """
+    __slots__ = ("node_id", "children")
     node_id: int
     children: list
     def __init__(self, node_id, children=None):